@@ -21,24 +21,44 @@ class Settings(BaseSettings):
     # Paths
     knowledge_base_dir: str
     faiss_index_path: str
+    faiss_mmap: bool = True
     log_file: Optional[str]
     
     # Embedding Model
     embedding_model_name: str
     embedding_device: str
+    embedding_backend: str = Field(default="torch", pattern="^(torch|onnx_int8)$")
+    onnx_model_dir: str = Field(default="models/onnx_int8", validate_default=True)
+    embedding_batch_size: int = Field(default=64, ge=1, le=1024)
+    embedding_compile: bool = True
+    embedding_cache_dir: str = Field(default=".emb_cache", validate_default=True)
     
     # Text Processing
     chunk_size: int = Field(ge=100, le=2000)
     chunk_overlap: int = Field(ge=0, le=200)
+    auto_chunk_size: bool = False
+    
+    # Conversation
+    max_history_turns: int = Field(default=6, ge=1, le=50)
+    max_history_chars: int = Field(default=8192, ge=256, le=65536)
     
     # Retrieval
     search_k: int = Field(ge=1, le=10)
+    faiss_index_type: str = Field(default="hnsw_sq", pattern="^(flat|flat_fp16|hnsw|hnsw_sq|pq|ivfpq)$")
+    faiss_hnsw_m: int = Field(default=32, ge=4, le=128)
+    faiss_ef_construction: int = Field(default=200, ge=16, le=1024)
+    faiss_ef_search: int = Field(default=64, ge=8, le=1024)
+    faiss_nlist: int = Field(default=256, ge=1, le=65536)
+    faiss_nprobe: int = Field(default=8, ge=1, le=1024)
+    faiss_pq_m: int = Field(default=48, ge=1, le=384)
     
     # LLM Configuration
     ollama_model_name: str
     ollama_base_url: str
     ollama_timeout: int = Field(ge=5, le=300)
     max_retries: int = Field(ge=1, le=10)
+    num_predict: int = Field(default=200, ge=16, le=4096)
+    social_num_predict: int = Field(default=48, ge=8, le=512)
     
     # Security
     max_query_length: int = Field(ge=10, le=5000)
@@ -47,14 +67,18 @@ class Settings(BaseSettings):
     # Performance
     enable_caching: bool
     cache_ttl: int = Field(ge=60, le=86400)
+    response_cache_dir: str = Field(default=".resp_cache", validate_default=True)
+    response_cache_size_mb: int = Field(default=512, ge=1, le=65536)
+    semantic_cache_threshold: float = Field(default=0.95, ge=0.0, le=1.0)
     max_concurrent_requests: int = Field(ge=1, le=50)
+    web_workers: int = Field(default=1, ge=1, le=64)
     
     # Monitoring
     enable_metrics: bool
     metrics_port: int = Field(ge=1000, le=65535)
     health_check_interval: int = Field(ge=5, le=300)
     
-    @field_validator('knowledge_base_dir', 'faiss_index_path', 'log_file')
+    @field_validator('knowledge_base_dir', 'faiss_index_path', 'log_file', 'embedding_cache_dir', 'onnx_model_dir', 'response_cache_dir')
     @classmethod
     def make_paths_absolute(cls, v: str) -> str:
         """Constructs absolute paths from the project root."""
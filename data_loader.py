@@ -1,43 +1,142 @@
-import glob
+import hashlib
+import os
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from itertools import islice
 from pathlib import Path
 from tqdm import tqdm
-from typing import List
+from typing import Iterator, List
 from config.settings import get_settings
+from utils.performance import PerformanceOptimizer
 
 from langchain.docstore.document import Document
 from langchain_community.document_loaders import PyPDFLoader, TextLoader
 from langchain.text_splitter import RecursiveCharacterTextSplitter
 
 
-def load_documents() -> List[Document]:
+def _load_pdf(file_path: str) -> List[Document]:
     """
-    Loads all supported documents (.pdf, .txt) from the knowledge base directory.
+    Extracts the text of a PDF page by page with the C-backed pypdfium2 parser.
+
+    Falls back to PyPDFLoader when pypdfium2 is not installed. Pages without
+    any text are skipped.
+
+    Args:
+        file_path (str): Path of the PDF file.
 
     Returns:
-        List[Document]: A list of loaded document objects.
+        List[Document]: One document per non-empty page.
+    """
+    try:
+        import pypdfium2
+    except ImportError:
+        return PyPDFLoader(file_path).load()
+
+    documents = []
+    pdf = pypdfium2.PdfDocument(file_path)
+    try:
+        for i in range(len(pdf)):
+            page = pdf.get_page(i)
+            textpage = page.get_textpage()
+            text = textpage.get_text_range()
+            textpage.close()
+            page.close()
+            if text.strip():
+                documents.append(Document(page_content=text, metadata={"source": file_path, "page": i}))
+    finally:
+        pdf.close()
+    return documents
+
+def _load_txt(file_path: str) -> List[Document]:
+    """Loads a plain-text file as a single document."""
+    return TextLoader(file_path).load()
+
+_settings = get_settings()
+
+def _make_splitter(chunk_size: int, chunk_overlap: int) -> RecursiveCharacterTextSplitter:
+    """Creates the text splitter used for all documents."""
+    return RecursiveCharacterTextSplitter(
+        chunk_size=chunk_size,
+        chunk_overlap=chunk_overlap,
+        separators=["\n\n", "\n", " ", ""],
+        length_function=len,
+        is_separator_regex=False
+    )
+
+# Built once: the splitter is stateless, so every call can share it
+_SPLITTER = _make_splitter(_settings.chunk_size, _settings.chunk_overlap)
+
+def _splitter_for(doc_count: int) -> RecursiveCharacterTextSplitter:
+    """
+    Returns the configured splitter, or, with AUTO_CHUNK_SIZE enabled, one sized
+    for a knowledge base of `doc_count` files by `PerformanceOptimizer`.
+    """
+    if not _settings.auto_chunk_size:
+        return _SPLITTER
+    chunk_size = PerformanceOptimizer.optimize_chunk_size(doc_count)
+    chunk_overlap = PerformanceOptimizer.optimize_overlap(chunk_size)
+    print(f"Using chunk size {chunk_size} with overlap {chunk_overlap} for {doc_count} documents.")
+    return _make_splitter(chunk_size, chunk_overlap)
+
+# Loader for each supported file extension
+_LOADERS = {"pdf": _load_pdf, "txt": _load_txt}
+
+def _load_one(file_path: str) -> List[Document]:
     """
+    Loads a single .pdf or .txt file. Runs inside a worker process.
+
+    Errors are caught here so that one unreadable file does not take down the pool.
+
+    Args:
+        file_path (str): Path of the file to load.
+
+    Returns:
+        List[Document]: The loaded pages, or an empty list on failure.
+    """
+    try:
+        loader = _LOADERS.get(file_path.rsplit(".", 1)[-1].lower())
+        if loader is None:
+            return [] # Skip unsupported file types
+        return loader(file_path)
+    except Exception as e:
+        print(f"Error loading document {file_path}: {e}")
+        return []
+
+def _list_files() -> List[str]:
+    """Lists the supported files in the knowledge base directory."""
     settings = get_settings()
     knowledge_base_path = Path(settings.knowledge_base_dir)
-    file_paths = glob.glob(str(knowledge_base_path / "*.pdf")) + glob.glob(str(knowledge_base_path / "*.txt"))
+    # Single directory pass instead of one glob per extension
+    try:
+        file_paths = [
+            entry.path for entry in os.scandir(knowledge_base_path)
+            if entry.is_file() and entry.name.rsplit(".", 1)[-1].lower() in _LOADERS
+        ]
+    except FileNotFoundError:
+        file_paths = []
     
     if not file_paths:
         print(f"No .pdf or .txt files found in '{settings.knowledge_base_dir}'. Please add your knowledge base files.")
-        return []
+    else:
+        print(f"Found {len(file_paths)} documents to ingest.")
+    return file_paths
 
-    print(f"Found {len(file_paths)} documents to ingest.")
+def load_documents() -> List[Document]:
+    """
+    Loads all supported documents (.pdf, .txt) from the knowledge base directory.
+
+    Returns:
+        List[Document]: A list of loaded document objects.
+    """
+    file_paths = _list_files()
+    if not file_paths:
+        return []
 
     documents = []
-    for file_path in tqdm(file_paths, desc="Loading Documents"):
-        try:
-            if file_path.endswith(".pdf"):
-                loader = PyPDFLoader(file_path)
-            elif file_path.endswith(".txt"):
-                loader = TextLoader(file_path)
-            else:
-                continue # Skip unsupported file types
-            documents.extend(loader.load())
-        except Exception as e:
-            print(f"Error loading document {file_path}: {e}")
+    with ProcessPoolExecutor(max_workers=os.cpu_count()) as executor:
+        results = executor.map(_load_one, file_paths, chunksize=4)
+        for loaded in tqdm(results, total=len(file_paths), desc="Loading Documents"):
+            documents.extend(loaded)
             
     return documents
 
@@ -51,9 +150,51 @@ def split_documents(documents: List[Document]) -> List[Document]:
     Returns:
         List[Document]: A list of smaller document chunks.
     """
-    settings = get_settings()
     print("Splitting documents into chunks...")
-    text_splitter = RecursiveCharacterTextSplitter(chunk_size=settings.chunk_size, chunk_overlap=settings.chunk_overlap)
-    texts = text_splitter.split_documents(documents)
+    splitter = _splitter_for(len({doc.metadata.get("source") for doc in documents}))
+    texts = splitter.split_documents(documents)
     print(f"Created {len(texts)} text chunks.")
-    return texts
\ No newline at end of file
+    return texts
+
+def _chunk_id(chunk: Document) -> str:
+    """Content hash of a chunk, used as its id."""
+    return hashlib.blake2b(chunk.page_content.encode(), digest_size=16).hexdigest()
+
+def stream_chunks() -> Iterator[Document]:
+    """
+    Loads, splits and de-duplicates the knowledge base one file at a time.
+
+    Unlike `load_documents` + `split_documents`, the corpus is never held in
+    memory as a whole: at most one file per worker process is loaded ahead of
+    the file currently being split, so memory stays bounded even when the
+    consumer (embedding) is much slower than parsing. Each unique chunk is
+    yielded as soon as it is produced, with its content hash in `metadata["id"]`.
+
+    Yields:
+        Document: The unique document chunks, in file order.
+    """
+    file_paths = _list_files()
+    if not file_paths:
+        return
+
+    splitter = _splitter_for(len(file_paths))
+    seen = set()
+    workers = os.cpu_count() or 1
+    with ProcessPoolExecutor(max_workers=workers) as executor, \
+            tqdm(total=len(file_paths), desc="Loading Documents") as progress:
+        # Executor.map would submit every file up front; keep one pending file per worker instead
+        remaining = iter(file_paths)
+        pending = deque(executor.submit(_load_one, path) for path in islice(remaining, workers))
+        while pending:
+            pages = pending.popleft().result()
+            next_path = next(remaining, None)
+            if next_path is not None:
+                pending.append(executor.submit(_load_one, next_path))
+            progress.update()
+
+            for chunk in splitter.split_documents(pages):
+                chunk_id = _chunk_id(chunk)
+                if chunk_id not in seen:
+                    seen.add(chunk_id)
+                    chunk.metadata["id"] = chunk_id
+                    yield chunk
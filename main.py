@@ -1,4 +1,5 @@
 import argparse
+import asyncio
 import sys
 import time
 from typing import Optional
@@ -10,6 +11,7 @@ from utils.logging_config import setup_logging, get_logger
 from utils.validation import validate_query, ValidationError
 from utils.monitoring import get_metrics_collector
 from utils.cache import cache_query_response, get_cached_response
+from utils.history import ChatHistory
 from utils.warmup import warmup_system
 from utils.performance import performance_monitor
 
@@ -28,27 +30,45 @@ def handle_ingest():
 def handle_chat():
     """Handles the interactive chat session."""
     logger = get_logger(__name__)
-    settings = get_settings()
-    metrics = get_metrics_collector()
     
     logger.info("Starting chat session")
     
-    # Warm up the system for optimal performance
-    vector_store_instance, llm = warmup_system()
-    
-    if not vector_store_instance:
-        logger.error("Failed to load vector store")
-        return
-
-    rag_chain = rag.create_rag_chain(vector_store_instance, llm=llm)
-    if not rag_chain:
-        logger.error("Failed to create RAG chain")
-        return
-
-    print("\n---")
-    print("Chatbot is ready! Type 'exit' or 'quit' to end the session.")
-    print("---")
-    
+    # A single event loop for the whole session, so async LLM clients can reuse connections
+    with asyncio.Runner() as runner:
+        # Warm up the system for optimal performance
+        vector_store_instance, llm = runner.run(warmup_system())
+        
+        if not vector_store_instance:
+            logger.error("Failed to load vector store")
+            return
+
+        rag_chain = rag.create_rag_chain(vector_store_instance, llm=llm)
+        if not rag_chain:
+            logger.error("Failed to create RAG chain")
+            return
+
+        print("\n---")
+        print("Chatbot is ready! Type 'exit' or 'quit' to end the session.")
+        print("---")
+
+        _chat_loop(rag_chain, runner)
+
+def _chat_loop(rag_chain, runner: asyncio.Runner):
+    """Reads queries from the console and answers them until the user exits."""
+    logger = get_logger(__name__)
+    settings = get_settings()
+    metrics = get_metrics_collector()
+    chat_history = ChatHistory(settings.max_history_turns, max_chars=settings.max_history_chars)
+
+    @performance_monitor
+    async def stream_chain(inputs):
+        # Print tokens as they arrive; keep them for caching and history
+        parts = []
+        async for chunk in rag_chain.astream(inputs):
+            print(chunk, end="", flush=True)
+            parts.append(chunk)
+        return "".join(parts)
+
     while True:
         try:
             query = input("> ")
@@ -73,8 +93,9 @@ def handle_chat():
             
             try:
                 # Check cache first
-                cached_response = get_cached_response(validated_query)
+                cached_response = get_cached_response(validated_query, context_key=chat_history.digest)
                 if cached_response:
+                    response = cached_response
                     response_time = time.time() - start_time
                     print("\nBot:", cached_response)
                     print("-" * 50)
@@ -84,18 +105,19 @@ def handle_chat():
                     metrics.record_request(success=True, response_time=response_time)
                     logger.info(f"Query processed from cache in {response_time:.2f}s")
                 else:
-                    # Get and print the response from the chain
-                    @performance_monitor
-                    def invoke_chain(query):
-                        return rag_chain.invoke(query)
-                    response = invoke_chain({"question": validated_query})
+                    # Stream the response from the chain
+                    print("\nBot: ", end="", flush=True)
+                    response = runner.run(stream_chain({
+                        "question": validated_query,
+                        "chat_history": chat_history.text
+                    }))
                     response_time = time.time() - start_time
                     
-                    print("\nBot:", response)
+                    print()
                     print("-" * 50)
                     
                     # Cache the response
-                    cache_query_response(validated_query, response)
+                    cache_query_response(validated_query, response, context_key=chat_history.digest)
                     
                     # Record successful request
                     metrics.record_request(success=True, response_time=response_time)
@@ -106,6 +128,10 @@ def handle_chat():
                         logger.warning(f"Slow response detected: {response_time:.2f}s")
                     elif response_time < 2:
                         logger.info(f"Fast response: {response_time:.2f}s")
+
+                # Remember the exchange for the next turn
+                chat_history.append("User", validated_query)
+                chat_history.append("BOT", response)
                 
             except Exception as e:
                 response_time = time.time() - start_time
@@ -125,7 +151,13 @@ def handle_chat():
 def handle_web():
     """Handles the web server."""
     import uvicorn
-    uvicorn.run("web.backend.main:app", host="0.0.0.0", port=8000, reload=False, ws="websockets")
+    settings = get_settings()
+    # loop="auto" picks uvloop when it is installed (uvicorn[standard]);
+    # permessage-deflate compresses the streamed answer text
+    uvicorn.run(
+        "web.backend.main:app", host="0.0.0.0", port=8000, reload=False, ws="websockets",
+        ws_per_message_deflate=True, loop="auto", workers=settings.web_workers
+    )
 
 def main():
     """
@@ -1,61 +1,179 @@
-from typing import Optional
+import asyncio
+import logging
+from typing import Any, AsyncIterator, Callable, Iterator, List, Optional
+from contextlib import contextmanager
+from functools import lru_cache
+import hashlib
 from operator import itemgetter
 from langchain_community.llms import Ollama
 from langchain.prompts import PromptTemplate
-from langchain.schema.runnable import Runnable, RunnablePassthrough, RunnableLambda
+from langchain.schema.runnable import Runnable, RunnablePassthrough, RunnableLambda, RunnableGenerator
 from langchain.schema.output_parser import StrOutputParser
 from langchain_community.vectorstores import FAISS
+from langchain.docstore.document import Document
 import re
+import requests
+import faiss
+import numpy as np
 
 from config.settings import get_settings
 from utils.performance import performance_monitor
 from utils.logging_config import get_logger
+from utils.cache import SemanticCache, SimpleCache, get_response_cache, response_cache_key
+from utils.monitoring import get_metrics_collector
+from utils.http_client import get_async_http_client
+from utils.query import QueryInfo, classify_query_type, normalize_query
+from utils.text import cut_at_sentence, pick_cutoff
 
 logger = get_logger(__name__)
 
+# Template with chat history support
+_ENHANCED_TEMPLATE = """You are a friendly AI assistant named Dolphin.
+
+Current conversation:
+{chat_history}
+
+Context for the user's question:
+{context}
+
+Rules:
+• Use the 'Current conversation' to understand the flow of the dialogue.
+• Use the 'Context' to answer the user's specific question.
+• If the user ask for short explanation explain in 2 to 3 sentences.
+• For greetings like "hi", "hello": respond warmly without using context.
+• If no relevant information in context: say "I don't have information about that topic."
+• Be natural and conversational.
+• Keep responses clear and focused.
+
+User: {question}
+Dolphin:"""
+
+_ENHANCED_PROMPT = PromptTemplate(
+    template=_ENHANCED_TEMPLATE,
+    input_variables=["chat_history", "context", "question"]
+)
+
+# Ultra-streamlined template
+_STREAMLINED_TEMPLATE = """You are Dolphin. Be friendly and helpful.
+
+Context:
+{context}
+
+Guidelines:
+- Warm greetings for social interaction
+- Answer using context only
+- No context = "I don't have that information"
+- Conversational tone, direct responses
+
+Q: {question}
+A:"""
+
+_STREAMLINED_PROMPT = PromptTemplate(
+    template=_STREAMLINED_TEMPLATE,
+    input_variables=["context", "question"]
+)
+
+# Any run of whitespace (including blank lines) collapses to a single space
+_WHITESPACE_RE = re.compile(r'\s+')
+
+# Prompt turn markers; the model continuing past them is generating throwaway text
+_STOP_SEQUENCES = ["\nUser:", "\nQ:", "\nDolphin:"]
+
+# Context given to the model for greetings and thanks, which skip retrieval
+_SOCIAL_CONTEXT = "No retrieval needed."
+
+class PooledOllama(Ollama):
+    """
+    Ollama LLM whose async calls go through the shared keep-alive HTTP client,
+    instead of opening a new aiohttp session (and connection) per request.
+    """
+
+    async def _acreate_stream(
+        self,
+        api_url: str,
+        payload: Any,
+        stop: Optional[List[str]] = None,
+        **kwargs: Any,
+    ) -> AsyncIterator[str]:
+        if self.stop is not None and stop is not None:
+            raise ValueError("`stop` found in both the input and default params.")
+        elif self.stop is not None:
+            stop = self.stop
+
+        params = self._default_params
+        for key in self._default_params:
+            if key in kwargs:
+                params[key] = kwargs[key]
+
+        if "options" in kwargs:
+            params["options"] = kwargs["options"]
+        else:
+            params["options"] = {
+                **params["options"],
+                "stop": stop,
+                **{k: v for k, v in kwargs.items() if k not in self._default_params},
+            }
+
+        if payload.get("messages"):
+            request_payload = {"messages": payload.get("messages", []), **params}
+        else:
+            request_payload = {"prompt": payload.get("prompt"), "images": payload.get("images", []), **params}
+
+        client = get_async_http_client()
+        async with client.stream(
+            "POST",
+            api_url,
+            headers={"Content-Type": "application/json", **(self.headers if isinstance(self.headers, dict) else {})},
+            auth=self.auth,
+            json=request_payload,
+            timeout=self.timeout,
+        ) as response:
+            if response.status_code != 200:
+                detail = (await response.aread()).decode("utf-8", "replace")
+                raise ValueError(f"Ollama call failed with status code {response.status_code}. Details: {detail}")
+            async for line in response.aiter_lines():
+                if line:
+                    yield line
+
 def get_ollama_llm():
     """
     Initializes and returns the Ollama LLM instance.
-    Tests the connection to ensure the Ollama service is running.
+    Checks that the Ollama service is running by listing its models, which
+    unlike a test generation does not make the server run the model.
     """
     settings = get_settings()
     try:
-        llm = Ollama(
+        response = requests.get(f"{settings.ollama_base_url}/api/tags", timeout=2.0)
+        response.raise_for_status()
+        available_models = [model.get("name") for model in response.json().get("models", [])]
+
+        llm = PooledOllama(
             model=settings.ollama_model_name,
+            base_url=settings.ollama_base_url,
+            timeout=settings.ollama_timeout,
             temperature=0.4,  # Optimal for TinyDolphin
-            num_predict=200,  # Limit response length
+            num_predict=settings.num_predict,  # Limit response length
             top_p=0.9,
-            repeat_penalty=1.1
+            repeat_penalty=1.1,
+            stop=_STOP_SEQUENCES  # End at the turn boundary instead of inventing the next turn
         )
-        # Simple test to check if the LLM is responsive
-        test_response = llm.invoke("Hi")
-        logger.info(f"Successfully connected to Ollama with model: {settings.ollama_model_name}")
-        logger.info(f"Test response: {test_response[:50]}...")
+        logger.info("Successfully connected to Ollama with model: %s", settings.ollama_model_name)
+        logger.info("Models available on the Ollama server: %s", available_models)
+        if not any(name.split(":")[0] == settings.ollama_model_name.split(":")[0] for name in available_models if name):
+            logger.warning("Model '%s' is not pulled yet; run `ollama pull %s`",
+                           settings.ollama_model_name, settings.ollama_model_name)
         return llm
     except Exception as e:
-        logger.error(f"Error connecting to Ollama: {e}")
+        logger.error("Error connecting to Ollama: %s", e)
         print(f"\nError connecting to Ollama: {e}")
         print("Please make sure the Ollama application is running and you have pulled the model.")
         print(f"You can pull the model with: `ollama pull {settings.ollama_model_name}`")
         return None
 
-def classify_query_type(question: str) -> dict:
-    """Classify the type of user input for better response handling"""
-    question_lower = question.lower().strip()
-    
-    greetings = ['hello', 'hi', 'hey', 'good morning', 'good afternoon', 'good evening', 'how are you']
-    thanks = ['thank', 'thanks', 'appreciate', 'grateful']
-    
-    is_greeting = any(greet in question_lower for greet in greetings)
-    is_thanks = any(thank in question_lower for thank in thanks)
-    has_question = '?' in question or any(word in question_lower for word in ['what', 'how', 'why', 'when', 'where', 'who', 'can you', 'could you', 'tell me', 'explain'])
-    
-    return {
-        'is_greeting': is_greeting,
-        'is_thanks': is_thanks,
-        'has_question': has_question,
-        'is_social': is_greeting or is_thanks
-    }
+def needs_retrieval(question: str) -> bool:
+    """Greetings and thanks that do not also ask something are answered without retrieval."""
+    query_info = normalize_query(question).info
+    return not (query_info.is_social and not query_info.has_question)
 
 def optimize_context_for_tinydolphin(docs, max_chars=1000) -> str:
     """
@@ -68,115 +186,278 @@ def optimize_context_for_tinydolphin(docs, max_chars=1000) -> str:
     if not docs:
         return "No relevant information available."
     
-    # Combine and prioritize most relevant content
-    combined_content = ""
-    char_count = 0
+    # Clean up content - remove excessive whitespace in a single pass
+    contents = [_WHITESPACE_RE.sub(' ', doc.page_content.strip()) for doc in docs]
+    
+    # Keep the most relevant documents that fit within the limit
+    n_full, remaining_chars = pick_cutoff([len(content) for content in contents], max_chars)
+    parts = contents[:n_full]
+    
+    # Add partial content of the next document if a meaningful amount fits
+    if n_full < len(contents) and remaining_chars > 150:
+        parts.append(cut_at_sentence(contents[n_full], remaining_chars))
+    
+    return "\n\n".join(parts).strip()
+
+def make_cached_retriever(vector_store: FAISS, k: int) -> Callable[[str], List[Document]]:
+    """
+    Builds a retrieval function that avoids repeated embedding and search work.
+
+    Retrieval results are cached by the normalized question, so a repeat (up to
+    case and whitespace) skips both the embedding model and FAISS. Otherwise query
+    embeddings are memoized on the raw query string, and retrieval results
+    are reused for any new query whose embedding is nearly identical (cosine
+    similarity above `settings.semantic_cache_threshold`) to a previous one.
+    """
+    settings = get_settings()
+    embed_query = lru_cache(maxsize=2048)(vector_store.embedding_function.embed_query)
+    semantic_cache = SemanticCache(threshold=settings.semantic_cache_threshold) if settings.enable_caching else None
+    question_cache = SimpleCache(default_ttl=settings.cache_ttl, max_size=2048) if settings.enable_caching else None
+
+    def search(question: str) -> List[Document]:
+        embedding = embed_query(question)
+        if semantic_cache is not None:
+            docs = semantic_cache.get(embedding)
+            if docs is not None:
+                logger.debug("Reusing retrieval results from semantic cache")
+                return docs
+        docs = vector_store.similarity_search_by_vector(embedding, k=k)
+        if semantic_cache is not None:
+            semantic_cache.put(embedding, docs)
+        return docs
+
+    def retrieve(question: str) -> List[Document]:
+        question_key = normalize_query(question).key
+        if question_cache is not None:
+            docs = question_cache.get(question_key)
+            if docs is not None:
+                return docs
+        docs = search(question)
+        if question_cache is not None:
+            question_cache.set(question_key, docs)
+        return docs
+
+    return retrieve
+
+def get_cached_retriever(vector_store: FAISS, k: int) -> Callable[[str], List[Document]]:
+    """
+    Returns the cached retriever for this vector store and k, creating it on first use.
+
+    The retrievers are kept on the store itself: each one references its store,
+    so a table keyed by the store would keep every replaced store alive.
+    """
+    per_store = getattr(vector_store, "_cached_retrievers", None)
+    if per_store is None:
+        per_store = vector_store._cached_retrievers = {}
+    if k not in per_store:
+        per_store[k] = make_cached_retriever(vector_store, k)
+    return per_store[k]
+
+def log_retrieved_docs(docs):
+    """Enhanced logging with relevance info"""
+    logger.info("Retrieved %d documents for processing", len(docs))
+    if logger.isEnabledFor(logging.DEBUG):
+        for i, doc in enumerate(docs):
+            content_preview = doc.page_content[:100].replace('\n', ' ')
+            source = getattr(doc, 'metadata', {}).get('source', 'Unknown')
+            logger.debug("Doc %d [%s]: %s...", i + 1, source, content_preview)
+    return docs
+
+def smart_context_processing(docs):
+    """Intelligent context processing based on query type and TinyDolphin optimization"""
+    # Log retrieved documents
+    docs = log_retrieved_docs(docs)
+
+    # Optimize context for TinyDolphin
+    optimized_context = optimize_context_for_tinydolphin(docs)
+
+    return optimized_context
+
+def batch_retrieve(vector_store: FAISS, questions: List[str], k: int) -> List[List[Document]]:
+    """
+    Retrieves the top-k documents for many questions with a single FAISS search.
+
+    All questions are embedded in one batch and searched together, instead of
+    one embedding call and one index search per question.
+    """
+    if not questions:
+        return []
+    # The embedding model returns unit-length vectors, matching the inner-product index
+    embeddings = np.asarray(vector_store.embedding_function.embed_documents(questions), dtype=np.float32)
+    _, indices = vector_store.index.search(embeddings, k)
+
+    results = []
+    for row in indices:
+        docs = []
+        for i in row:
+            if i == -1:  # Fewer than k vectors in the index
+                continue
+            doc = vector_store.docstore.search(vector_store.index_to_docstore_id[i])
+            if isinstance(doc, Document):
+                docs.append(doc)
+        results.append(docs)
+    return results
+
+def minimal_context_processing(docs):
+    """Minimal context processing for maximum efficiency"""
+    if not docs:
+        return "No information available."
+    
+    # Simple concatenation with basic optimization
+    context_parts = []
+    total_chars = 0
     
     for doc in docs:
-        content = doc.page_content.strip()
-        # Clean up content - remove excessive whitespace
-        content = re.sub(r'\n\s*\n', '\n\n', content)
-        content = re.sub(r'\s+', ' ', content)
-        
-        # Add content if it fits within limit
-        if char_count + len(content) <= max_chars:
-            combined_content += content + "\n\n"
-            char_count += len(content)
+        content = doc.page_content.strip()[:400]  # Limit each doc to 400 chars
+        if total_chars + len(content) < 800:  # Total limit 800 chars
+            context_parts.append(content)
+            total_chars += len(content)
         else:
-            # Add partial content if possible
-            remaining_chars = max_chars - char_count
-            if remaining_chars > 150:  # Only add if meaningful amount
-                # Try to cut at sentence boundary
-                partial = content[:remaining_chars]
-                last_period = partial.rfind('.')
-                if last_period > remaining_chars * 0.7:  # If we can cut at a reasonable sentence
-                    partial = partial[:last_period + 1]
-                else:
-                    partial = partial + "..."
-                combined_content += partial
             break
     
-    return combined_content.strip()
+    return "\n\n".join(context_parts)
 
-@performance_monitor
-def create_rag_chain(vector_store: FAISS, llm: Optional[Ollama] = None) -> Optional[Runnable]:
+def fast_invoke(vector_store: FAISS, llm: Ollama, question: str, chat_history: str = "") -> str:
     """
-    Creates an enhanced RAG pipeline optimized for TinyDolphin with improved prompting and context handling.
-    This version incorporates chat history for conversational context.
+    Answers a question like `create_rag_chain` does, but calls the retriever,
+    prompt formatting and LLM directly instead of going through Runnable dispatch.
     """
-    if not llm:
-        llm = get_ollama_llm()
-        if not llm:
-            return None
-        
     settings = get_settings()
-    retriever = vector_store.as_retriever(search_kwargs={'k': settings.search_k})
+    if not needs_retrieval(question):
+        prompt_str = _ENHANCED_TEMPLATE.format(chat_history=chat_history, context=_SOCIAL_CONTEXT, question=question)
+        return llm.invoke(prompt_str, num_predict=settings.social_num_predict)
+
+    docs = get_cached_retriever(vector_store, settings.search_k)(question)
+    prompt_str = _ENHANCED_TEMPLATE.format(
+        chat_history=chat_history,
+        context=smart_context_processing(docs),
+        question=question
+    )
+    return llm.invoke(prompt_str)
 
-    # Template with chat history support
-    enhanced_template = """You are a friendly AI assistant named Dolphin.
+def _doc_id(doc: Document) -> str:
+    """Stable chunk id; indexes built before ids were stored fall back to a content hash."""
+    return doc.metadata.get("id") or hashlib.blake2b(doc.page_content.encode(), digest_size=16).hexdigest()
 
-Current conversation:
-{chat_history}
+def context_from_docs(process: Callable[[List[Document]], str]) -> Callable[[dict], str]:
+    """
+    Wraps a context-processing function so that it takes the chain inputs.
+    Social queries get a fixed context instead.
+    """
+    def context_for(inputs: dict) -> str:
+        if not needs_retrieval(inputs["question"]):
+            return _SOCIAL_CONTEXT
+        return process(inputs["docs"])
 
-Context for the user's question:
-{context}
+    return context_for
 
-Rules:
-• Use the 'Current conversation' to understand the flow of the dialogue.
-• Use the 'Context' to answer the user's specific question.
-• If the user ask for short explanation explain in 2 to 3 sentences.
-• For greetings like "hi", "hello": respond warmly without using context.
-• If no relevant information in context: say "I don't have information about that topic."
-• Be natural and conversational.
-• Keep responses clear and focused.
+def _response_cache_writer(key: str) -> Runnable:
+    """Pass streamed chunks through unchanged and store the full response once complete."""
+    settings = get_settings()
 
-User: {question}
-Dolphin:"""
+    def store(parts: List[str]) -> None:
+        get_response_cache().set(key, "".join(parts), expire=settings.cache_ttl)
 
-    def log_retrieved_docs(docs):
-        """Enhanced logging with relevance info"""
-        logger.info(f"Retrieved {len(docs)} documents for processing")
-        for i, doc in enumerate(docs):
-            content_preview = doc.page_content[:100].replace('\n', ' ')
-            source = getattr(doc, 'metadata', {}).get('source', 'Unknown')
-            logger.debug(f"Doc {i+1} [{source}]: {content_preview}...")
-        return docs
+    def tee(chunks: Iterator[str]) -> Iterator[str]:
+        parts = []
+        for chunk in chunks:
+            parts.append(chunk)
+            yield chunk
+        store(parts)
 
-    def smart_context_processing(docs):
-        """Intelligent context processing based on query type and TinyDolphin optimization"""
-        # Log retrieved documents
-        docs = log_retrieved_docs(docs)
-        
-        # Optimize context for TinyDolphin
-        optimized_context = optimize_context_for_tinydolphin(docs)
-        
-        return optimized_context
+    async def atee(chunks: AsyncIterator[str]) -> AsyncIterator[str]:
+        parts = []
+        async for chunk in chunks:
+            parts.append(chunk)
+            yield chunk
+        store(parts)
 
-    def enhanced_question_processing(question: str) -> str:
-        """Process the question and add metadata for better responses"""
-        query_info = classify_query_type(question)
-        
-        # Log query classification
-        logger.debug(f"Query classification: {query_info}")
-        
-        return question
+    return RunnableGenerator(tee, atee)
+
+def with_answer_budget(prompt: PromptTemplate, llm: Ollama) -> Runnable:
+    """
+    Formats the prompt and calls the LLM, capping greetings and thanks at
+    `settings.social_num_predict` tokens instead of `settings.num_predict`.
+    """
+    settings = get_settings()
+    answer = prompt | llm
+    social_answer = prompt | llm.bind(num_predict=settings.social_num_predict)
+
+    def select(inputs: dict) -> Runnable:
+        return answer if needs_retrieval(inputs["question"]) else social_answer
+
+    return RunnableLambda(select)
+
+def with_response_cache(retriever: Callable[[str], List[Document]], generation: Runnable) -> Runnable:
+    """
+    Retrieves documents first (none for greetings and thanks, see `needs_retrieval`),
+    then answers from the persistent response cache
+    when the same normalized question was already answered from the same chunks
+    with the same chat history.
+    Otherwise runs `generation` (which receives the inputs plus "docs") and caches its output.
+    """
+    settings = get_settings()
+    metrics = get_metrics_collector()
 
-    prompt = PromptTemplate(
-        template=enhanced_template,
-        input_variables=["chat_history", "context", "question"]
+    def generate_or_reuse(inputs: dict):
+        if not settings.enable_caching:
+            return generation
+        key = response_cache_key(
+            inputs["question"], (_doc_id(doc) for doc in inputs["docs"]), inputs.get("chat_history", "")
+        )
+        cached_response = get_response_cache().get(key)
+        metrics.record_cache_event(hit=cached_response is not None)
+        if cached_response is not None:
+            logger.info("Response served from persistent cache")
+            return cached_response
+        return generation | _response_cache_writer(key)
+
+    def retrieve_unless_social(question: str) -> List[Document]:
+        if not needs_retrieval(question):
+            logger.debug("Social query, skipping retrieval")
+            return []
+        return retriever(question)
+
+    async def aretrieve_unless_social(question: str) -> List[Document]:
+        # Embedding and FAISS search are blocking native calls; run them in the
+        # default executor so other requests keep streaming meanwhile
+        if not needs_retrieval(question):
+            logger.debug("Social query, skipping retrieval")
+            return []
+        return await asyncio.to_thread(retriever, question)
+
+    return (
+        RunnablePassthrough.assign(
+            docs=itemgetter("question") | RunnableLambda(retrieve_unless_social, afunc=aretrieve_unless_social)
+        )
+        | RunnableLambda(generate_or_reuse)
     )
 
-    # RAG chain with chat history
-    rag_chain = (
+@performance_monitor
+def create_rag_chain(vector_store: FAISS, llm: Optional[Ollama] = None) -> Optional[Runnable]:
+    """
+    Creates an enhanced RAG pipeline optimized for TinyDolphin with improved prompting and context handling.
+    This version incorporates chat history for conversational context.
+    """
+    if not llm:
+        llm = get_ollama_llm()
+        if not llm:
+            return None
+        
+    settings = get_settings()
+    retriever = get_cached_retriever(vector_store, settings.search_k)
+
+    # Generation from already-retrieved documents, with chat history
+    generation = (
         {
-            "context": itemgetter("question") | retriever | smart_context_processing,
+            "context": RunnableLambda(context_from_docs(smart_context_processing)),
             "question": itemgetter("question"),
             "chat_history": itemgetter("chat_history")
         }
-        | prompt
-        | llm
+        | with_answer_budget(_ENHANCED_PROMPT, llm)
         | StrOutputParser()
     )
+    rag_chain = with_response_cache(retriever, generation)
 
     return rag_chain
 
@@ -192,62 +473,65 @@ def create_streamlined_rag_chain(vector_store: FAISS, llm: Optional[Ollama] = No
             return None
         
     settings = get_settings()
-    retriever = vector_store.as_retriever(search_kwargs={'k': min(settings.search_k, 3)})  # Limit to 3 docs max
-
-    # Ultra-streamlined template
-    streamlined_template = """You are Dolphin. Be friendly and helpful.
-
-Context:
-{context}
-
-Guidelines:
-- Warm greetings for social interaction
-- Answer using context only
-- No context = "I don't have that information"
-- Conversational tone, direct responses
-
-Q: {question}
-A:"""
-
-    def minimal_context_processing(docs):
-        """Minimal context processing for maximum efficiency"""
-        if not docs:
-            return "No information available."
-        
-        # Simple concatenation with basic optimization
-        context_parts = []
-        total_chars = 0
-        
-        for doc in docs:
-            content = doc.page_content.strip()[:400]  # Limit each doc to 400 chars
-            if total_chars + len(content) < 800:  # Total limit 800 chars
-                context_parts.append(content)
-                total_chars += len(content)
-            else:
-                break
-        
-        return "\n\n".join(context_parts)
-
-    prompt = PromptTemplate(
-        template=streamlined_template,
-        input_variables=["context", "question"]
-    )
+    retriever = get_cached_retriever(vector_store, min(settings.search_k, 3))  # Limit to 3 docs max
 
     # Streamlined RAG chain
-    rag_chain = (
+    generation = (
         {
-            "context": itemgetter("question") | retriever | minimal_context_processing,
+            "context": RunnableLambda(context_from_docs(minimal_context_processing)),
             "question": itemgetter("question")
         }
-        | prompt
-        | llm
+        | with_answer_budget(_STREAMLINED_PROMPT, llm)
         | StrOutputParser()
     )
+    rag_chain = with_response_cache(retriever, generation)
 
     return rag_chain
 
-def test_rag_chain(rag_chain: Runnable):
-    """Test the RAG chain with various query types"""
+async def ainvoke_batch(rag_chain: Runnable, inputs: List[dict], return_exceptions: bool = False) -> List[Any]:
+    """
+    Runs several chain inputs concurrently and returns the results in input order.
+
+    The requests overlap on the Ollama server up to its OLLAMA_NUM_PARALLEL setting;
+    beyond that they queue there rather than here.
+    """
+    return await asyncio.gather(
+        *(rag_chain.ainvoke(chain_input) for chain_input in inputs),
+        return_exceptions=return_exceptions
+    )
+
+@contextmanager
+def index_on_gpu(vector_store: Optional[FAISS]):
+    """
+    Temporarily moves the vector store's FAISS index to GPU 0 when FAISS-GPU and
+    a CUDA device are available. GPU indexes are not safe for concurrent calls,
+    so only search from one thread while it is active. Otherwise (faiss-cpu installs, or index types
+    FAISS cannot move such as HNSW) the CPU index is used unchanged.
+    """
+    cpu_index = vector_store.index if vector_store is not None else None
+    try:
+        if cpu_index is not None and hasattr(faiss, "StandardGpuResources") and faiss.get_num_gpus() > 0:
+            resources = faiss.StandardGpuResources()
+            vector_store.index = faiss.index_cpu_to_gpu(resources, 0, cpu_index)
+            logger.info("Running retrieval on FAISS-GPU")
+    except Exception as e:
+        logger.warning("Could not move the FAISS index to GPU, using CPU: %s", e)
+    try:
+        yield vector_store
+    finally:
+        if cpu_index is not None:
+            vector_store.index = cpu_index
+
+def test_rag_chain(rag_chain: Runnable, vector_store: Optional[FAISS] = None):
+    """
+    Test the RAG chain with various query types.
+
+    When the vector store is given, retrieval for all test queries is first run
+    as one batched search, which warms the embedding model and index. That
+    search runs on FAISS-GPU when a GPU is available; the chain runs afterwards
+    on the CPU index, since its concurrent retrievals would otherwise call the
+    GPU index from several threads at once.
+    """
     test_queries = [
         "Hello! How are you today?",
         "What is the main policy?",
@@ -256,16 +540,25 @@ def test_rag_chain(rag_chain: Runnable):
         "I don't understand this concept"
     ]
     
+    if vector_store is not None:
+        settings = get_settings()
+        with index_on_gpu(vector_store):
+            retrieved = batch_retrieve(vector_store, test_queries, settings.search_k)
+        for query, docs in zip(test_queries, retrieved):
+            logger.debug("Retrieved %d documents for '%s'", len(docs), query)
+
     logger.info("Testing RAG chain with sample queries...")
-    for query in test_queries:
-        try:
-            response = rag_chain.invoke({"question": query})
-            logger.info(f"Q: {query}")
-            logger.info(f"A: {response[:100]}...")
-            print(f"\nUser: {query}")
-            print(f"Dolphin: {response}")
-        except Exception as e:
-            logger.error(f"Error with query '{query}': {e}")
+    responses = asyncio.run(
+        ainvoke_batch(rag_chain, [{"question": query} for query in test_queries], return_exceptions=True)
+    )
+    for query, response in zip(test_queries, responses):
+        if isinstance(response, Exception):
+            logger.error("Error with query '%s': %s", query, response)
+            continue
+        logger.info("Q: %s", query)
+        logger.info("A: %s...", response[:100])
+        print(f"\nUser: {query}")
+        print(f"Dolphin: {response}")
 
 # Usage example and recommendations
 """
@@ -280,6 +573,15 @@ streamlined_chain = create_streamlined_rag_chain(vector_store, llm)
 # Test the chain:
 test_rag_chain(rag_chain)
 
+# Retrieval only, for many questions in one FAISS search:
+docs_per_question = batch_retrieve(vector_store, questions, k=4)
+
+# Several questions at once (overlapping on the Ollama server):
+responses = asyncio.run(ainvoke_batch(rag_chain, [{"question": q} for q in questions]))
+
 # In your main application:
 response = rag_chain.invoke({"question": "Your question here"})
+
+# Lowest-overhead path for a single answer (no Runnable dispatch):
+response = fast_invoke(vector_store, llm, "Your question here", chat_history="")
 """
\ No newline at end of file
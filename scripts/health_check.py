@@ -6,6 +6,14 @@ import sys
 import json
 import requests
 from datetime import datetime
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+# Shared session so repeated alerts reuse pooled keep-alive connections
+_SESSION = requests.Session()
+_ADAPTER = HTTPAdapter(pool_connections=4, pool_maxsize=8, max_retries=Retry(total=2, backoff_factor=0.2))
+_SESSION.mount('https://', _ADAPTER)
+_SESSION.mount('http://', _ADAPTER)
 
 def check_health():
     """Check application health and return status."""
@@ -39,7 +47,7 @@ def send_alert(webhook_url: str, message: str):
             "text": f"RAG Chatbot Alert: {message}",
             "timestamp": datetime.now().isoformat()
         }
-        response = requests.post(webhook_url, json=payload, timeout=10)
+        response = _SESSION.post(webhook_url, json=payload, timeout=10)
         response.raise_for_status()
     except Exception as e:
         print(f"Failed to send alert: {e}")
@@ -0,0 +1,88 @@
+"""
+Unit tests for caching utilities.
+"""
+import pytest
+import time
+from utils.cache import SemanticCache, SimpleCache, response_cache_key
+
+class TestSimpleCache:
+    """Test cases for the in-memory TTL cache."""
+    
+    def test_set_and_get(self):
+        """Test a stored value is returned."""
+        cache = SimpleCache()
+        cache.set("key", "value")
+        assert cache.get("key") == "value"
+        assert cache.get("missing") is None
+    
+    def test_expired_entry(self):
+        """Test expired entries are dropped on access."""
+        cache = SimpleCache()
+        cache.set("key", "value", ttl=1)
+        cache.cache["key"]["expires_at"] = time.time() - 1
+        
+        assert cache.get("key") is None
+        assert cache.size() == 0
+    
+    def test_evicts_least_recently_used(self):
+        """Test the least recently used entry is evicted when full."""
+        cache = SimpleCache(max_size=2)
+        cache.set("a", 1)
+        cache.set("b", 2)
+        cache.get("a")  # "b" is now the least recently used
+        cache.set("c", 3)
+        
+        assert cache.size() == 2
+        assert cache.get("b") is None
+        assert cache.get("a") == 1
+        assert cache.get("c") == 3
+    
+    def test_bytes_keys(self):
+        """Test raw digest keys are supported."""
+        cache = SimpleCache()
+        cache.set(b"query:\x00\xff", "value")
+        assert cache.get(b"query:\x00\xff") == "value"
+
+class TestResponseCacheKey:
+    """Test cases for the persistent response cache key."""
+    
+    def test_normalized_query_shares_key(self):
+        """Test case and whitespace differences map to the same key."""
+        assert response_cache_key("What is  the policy?", ["a", "b"]) == response_cache_key("what is the policy?", ["a", "b"])
+    
+    def test_chat_history_changes_key(self):
+        """Test the same question in another conversation gets another key."""
+        key = response_cache_key("can you explain that?", ["a"], "User: vacation\nBOT: 20 days")
+        assert key != response_cache_key("can you explain that?", ["a"], "User: sick leave\nBOT: 10 days")
+        assert key != response_cache_key("can you explain that?", ["a"])
+    
+    def test_doc_order_changes_key(self):
+        """Test the same chunks in another rank order get another key."""
+        assert response_cache_key("policy?", ["a", "b"]) != response_cache_key("policy?", ["b", "a"])
+
+class TestSemanticCache:
+    """Test cases for the embedding-similarity cache."""
+    
+    def test_near_duplicate_hits(self):
+        """Test an embedding above the similarity threshold returns the stored value."""
+        cache = SemanticCache(threshold=0.95)
+        cache.put([1.0, 0.0, 0.0], "vacation docs")
+        assert cache.get([0.99, 0.05, 0.0]) == "vacation docs"
+    
+    def test_dissimilar_misses(self):
+        """Test an embedding below the similarity threshold is a miss."""
+        cache = SemanticCache(threshold=0.95)
+        cache.put([1.0, 0.0, 0.0], "vacation docs")
+        assert cache.get([0.0, 1.0, 0.0]) is None
+        assert cache.get([0.7, 0.7, 0.0]) is None
+    
+    def test_evicts_oldest_at_capacity(self):
+        """Test the oldest entry is dropped once max_entries is reached."""
+        cache = SemanticCache(threshold=0.95, max_entries=2)
+        cache.put([1.0, 0.0, 0.0], "first")
+        cache.put([0.0, 1.0, 0.0], "second")
+        cache.put([0.0, 0.0, 1.0], "third")
+        assert cache.size() == 2
+        assert cache.get([1.0, 0.0, 0.0]) is None
+        assert cache.get([0.0, 1.0, 0.0]) == "second"
+        assert cache.get([0.0, 0.0, 1.0]) == "third"
@@ -0,0 +1,49 @@
+"""
+Unit tests for chat history utilities.
+"""
+import pytest
+from utils.history import ChatHistory
+
+class TestChatHistory:
+    """Test cases for the bounded chat history."""
+    
+    def test_empty_history(self):
+        """Test a new history has no transcript."""
+        history = ChatHistory(max_turns=2)
+        assert history.text == ""
+        assert len(history) == 0
+    
+    def test_transcript_format(self):
+        """Test messages are formatted one per line."""
+        history = ChatHistory(max_turns=2)
+        history.append("User", "Hello")
+        history.append("BOT", "Hi there!")
+        assert history.text == "User: Hello\nBOT: Hi there!"
+    
+    def test_oldest_turn_dropped(self):
+        """Test the transcript keeps only the last max_turns exchanges."""
+        history = ChatHistory(max_turns=1)
+        history.append("User", "first")
+        history.append("BOT", "one")
+        history.append("User", "second")
+        history.append("BOT", "two")
+        assert len(history) == 2
+        assert history.text == "User: second\nBOT: two"
+    
+    def test_char_budget_drops_oldest_messages(self):
+        """Test the transcript is trimmed from the front to fit max_chars."""
+        history = ChatHistory(max_turns=5, max_chars=30)
+        history.append("User", "first question")
+        history.append("BOT", "first answer")
+        history.append("User", "second")
+        assert history.text == "BOT: first answer\nUser: second"
+        history.append("BOT", "a" * 40)
+        assert history.text == "BOT: " + "a" * 40
+    
+    def test_digest_changes_with_history(self):
+        """Test the digest tracks the transcript."""
+        history = ChatHistory(max_turns=2)
+        empty_digest = history.digest
+        history.append("User", "Hello")
+        assert history.digest != empty_digest
+        assert len(history.digest) == 16
@@ -50,6 +50,18 @@ class TestMetricsCollector:
         assert collector.metrics.average_response_time == 2.0
         assert collector.metrics.error_counts["TimeoutError"] == 1
     
+    def test_average_response_time_window(self):
+        """Test that the average only covers the most recent response times."""
+        collector = MetricsCollector()
+        
+        for _ in range(100):
+            collector.record_request(success=True, response_time=10.0)
+        for _ in range(50):
+            collector.record_request(success=True, response_time=2.0)
+        
+        assert len(collector.metrics.response_times) == 100
+        assert collector.metrics.average_response_time == pytest.approx(6.0)
+    
     def test_record_cache_events(self):
         """Test recording cache events."""
         collector = MetricsCollector()
@@ -0,0 +1,33 @@
+"""
+Unit tests for query normalization.
+"""
+import pytest
+from utils.query import classify_query_type, normalize_query
+
+class TestNormalizeQuery:
+    """Test cases for query normalization and classification."""
+    
+    def test_case_and_whitespace_share_key(self):
+        """Test queries differing only in case and spacing normalize identically."""
+        first = normalize_query("What is the  Vacation policy?")
+        second = normalize_query("  what is the vacation\npolicy? ")
+        assert first.lower == "what is the vacation policy?"
+        assert first.key == second.key
+        assert first.raw != second.raw
+    
+    def test_greeting(self):
+        """Test a plain greeting is social and not a question."""
+        info = classify_query_type("Hello there")
+        assert info.is_greeting and info.is_social
+        assert not info.has_question
+    
+    def test_keywords_match_whole_words(self):
+        """Test keywords inside other words are not matched."""
+        info = classify_query_type("show this list")
+        assert not info.is_greeting
+        assert not info.has_question
+    
+    def test_thanks_with_question(self):
+        """Test thanks combined with a question."""
+        info = classify_query_type("Thanks! Can you explain the leave process")
+        assert info.is_thanks and info.has_question
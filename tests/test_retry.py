@@ -0,0 +1,75 @@
+"""
+Unit tests for retry utilities.
+"""
+import asyncio
+import pytest
+from utils.retry import retry_with_backoff, RetryError
+
+class TestRetryWithBackoff:
+    """Test cases for the retry decorator."""
+    
+    def test_succeeds_after_transient_failures(self):
+        """Test the call is retried until it succeeds."""
+        calls = []
+        
+        @retry_with_backoff(max_attempts=3, base_delay=0.0, exceptions=(ConnectionError,))
+        def flaky():
+            calls.append(1)
+            if len(calls) < 3:
+                raise ConnectionError("down")
+            return "ok"
+        
+        assert flaky() == "ok"
+        assert len(calls) == 3
+    
+    def test_raises_retry_error_when_exhausted(self):
+        """Test RetryError is raised after the last attempt."""
+        @retry_with_backoff(max_attempts=2, base_delay=0.0, exceptions=(ConnectionError,))
+        def always_down():
+            raise ConnectionError("down")
+        
+        with pytest.raises(RetryError):
+            always_down()
+    
+    def test_other_exceptions_are_not_retried(self):
+        """Test exceptions outside the retry list propagate immediately."""
+        calls = []
+        
+        @retry_with_backoff(max_attempts=3, base_delay=0.0, exceptions=(ConnectionError,))
+        def buggy():
+            calls.append(1)
+            raise KeyError("bug")
+        
+        with pytest.raises(KeyError):
+            buggy()
+        assert len(calls) == 1
+    
+    def test_async_function_is_retried(self):
+        """Test coroutine functions stay coroutines and are retried."""
+        calls = []
+        
+        @retry_with_backoff(max_attempts=3, base_delay=0.0, exceptions=(TimeoutError,))
+        async def flaky():
+            calls.append(1)
+            if len(calls) < 2:
+                raise TimeoutError("slow")
+            return "ok"
+        
+        assert asyncio.iscoroutinefunction(flaky)
+        assert asyncio.run(flaky()) == "ok"
+        assert len(calls) == 2
+    
+    def test_jittered_delay_stays_within_bounds(self, monkeypatch):
+        """Test jitter scales each backoff delay into [0.5, 1.0) of its nominal value."""
+        delays = []
+        monkeypatch.setattr("utils.retry.time.sleep", delays.append)
+        
+        @retry_with_backoff(max_attempts=4, base_delay=1.0, exceptions=(ConnectionError,))
+        def always_down():
+            raise ConnectionError("down")
+        
+        with pytest.raises(RetryError):
+            always_down()
+        assert len(delays) == 3
+        for attempt, delay in enumerate(delays):
+            assert 0.5 * 2 ** attempt <= delay < 2 ** attempt
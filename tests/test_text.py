@@ -0,0 +1,45 @@
+"""
+Unit tests for context truncation helpers.
+"""
+import pytest
+from utils.text import cut_at_sentence, pick_cutoff
+
+class TestCutAtSentence:
+    """Test cases for cutting context at a sentence boundary."""
+    
+    @pytest.mark.parametrize("mark", [".", "!", "?"])
+    def test_cuts_after_sentence_end(self, mark):
+        """Test the cut keeps everything up to the last sentence end in the window."""
+        content = f"The policy covers all staff members{mark} Remote work is allowed"
+        assert cut_at_sentence(content, 45) == f"The policy covers all staff members{mark}"
+    
+    def test_last_sentence_end_in_window_wins(self):
+        """Test the latest sentence end in the tail window is used."""
+        content = "Twenty days of leave! Ask HR. More text follows here"
+        assert cut_at_sentence(content, 33) == "Twenty days of leave! Ask HR."
+    
+    def test_sentence_end_before_window_is_ignored(self):
+        """Test a boundary in the first 70% falls back to a hard cut."""
+        content = "Short. Then a long run of words with no ending at all"
+        assert cut_at_sentence(content, 40) == content[:40] + "..."
+    
+    def test_hard_cut_without_boundary(self):
+        """Test text with no sentence end is cut at the limit with an ellipsis."""
+        content = "no punctuation anywhere in this text at all"
+        assert cut_at_sentence(content, 20) == "no punctuation anywh..."
+    
+    def test_punctuation_inside_word_is_not_a_boundary(self):
+        """Test a dot not followed by whitespace does not end a sentence."""
+        content = "Version numbers like 3.14 and 2.71 appear here"
+        assert cut_at_sentence(content, 30) == content[:30] + "..."
+
+class TestPickCutoff:
+    """Test cases for choosing how many documents fit whole."""
+    
+    def test_all_fit(self):
+        """Test every item fits and the remainder is reported."""
+        assert pick_cutoff([100, 200], 500) == (2, 200)
+    
+    def test_partial_next_item(self):
+        """Test the first item that overflows gets the remaining budget."""
+        assert pick_cutoff([400, 400, 400], 1000) == (2, 200)
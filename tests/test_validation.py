@@ -46,11 +46,21 @@ class TestValidateQuery:
         with pytest.raises(ValidationError, match="potentially unsafe content"):
             validate_query(malicious_query)
     
+    def test_non_ascii_case_variant_script_tag(self):
+        """Test script tags spelled with Unicode case variants are still rejected."""
+        with pytest.raises(ValidationError, match="potentially unsafe content"):
+            validate_query("<scrİpt>x</scrİpt>")
+    
     def test_whitespace_normalization(self):
         """Test excessive whitespace is normalized."""
         query = "What   is   the    policy?"
         result = validate_query(query)
         assert result == "What is the policy?"
+    
+    def test_mixed_whitespace_normalization(self):
+        """Test tabs, newlines and surrounding whitespace are collapsed and trimmed."""
+        result = validate_query("\n\t What\tis \r\n the policy?  \n")
+        assert result == "What is the policy?"
 
 class TestValidateFilePath:
     """Test cases for file path validation."""
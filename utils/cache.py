@@ -4,50 +4,125 @@ Caching utilities for improved performance.
 import time
 import hashlib
 import json
-from typing import Any, Optional, Dict
+import threading
+from collections import OrderedDict
+from typing import Any, Optional, Dict, Hashable, Iterable, List, Sequence
 from functools import wraps
 import logging
 
+from utils.query import normalize_query
+
 logger = logging.getLogger(__name__)
 
 class SimpleCache:
-    """Simple in-memory cache with TTL support."""
+    """Simple thread-safe in-memory cache with TTL support and LRU eviction."""
     
-    def __init__(self, default_ttl: int = 3600):
-        self.cache: Dict[str, Dict[str, Any]] = {}
+    def __init__(self, default_ttl: int = 3600, max_size: int = 10000):
+        self.cache: "OrderedDict[Hashable, Dict[str, Any]]" = OrderedDict()
         self.default_ttl = default_ttl
+        self.max_size = max_size
+        self._lock = threading.RLock()
     
-    def get(self, key: str) -> Optional[Any]:
+    def get(self, key: Hashable) -> Optional[Any]:
         """Get value from cache if not expired."""
-        if key not in self.cache:
-            return None
-        
-        entry = self.cache[key]
-        if time.time() > entry['expires_at']:
-            del self.cache[key]
-            return None
-        
-        logger.debug(f"Cache hit for key: {key[:20]}...")
+        with self._lock:
+            entry = self.cache.get(key)
+            if entry is None:
+                return None
+            
+            if time.time() > entry['expires_at']:
+                del self.cache[key]
+                return None
+            
+            self.cache.move_to_end(key)
+        logger.debug("Cache hit for key: %.20r...", key)
         return entry['value']
     
-    def set(self, key: str, value: Any, ttl: Optional[int] = None) -> None:
-        """Set value in cache with TTL."""
+    def set(self, key: Hashable, value: Any, ttl: Optional[int] = None) -> None:
+        """Set value in cache with TTL, evicting the least recently used entry when full."""
         ttl = ttl or self.default_ttl
-        self.cache[key] = {
-            'value': value,
-            'expires_at': time.time() + ttl
-        }
-        logger.debug(f"Cache set for key: {key[:20]}...")
+        with self._lock:
+            self.cache[key] = {
+                'value': value,
+                'expires_at': time.time() + ttl
+            }
+            self.cache.move_to_end(key)
+            if len(self.cache) > self.max_size:
+                self.cache.popitem(last=False)
+        logger.debug("Cache set for key: %.20r...", key)
     
     def clear(self) -> None:
         """Clear all cache entries."""
-        self.cache.clear()
+        with self._lock:
+            self.cache.clear()
         logger.info("Cache cleared")
     
     def size(self) -> int:
         """Get number of cache entries."""
         return len(self.cache)
 
+class SemanticCache:
+    """
+    In-memory cache keyed by embedding similarity rather than exact text.
+
+    Stored embeddings are L2-normalized and kept in a FAISS inner-product index,
+    so a lookup is a top-1 cosine search. A hit requires similarity >= threshold.
+    Once `max_entries` are stored, the oldest entry is evicted for each new one.
+    """
+    
+    def __init__(self, threshold: float = 0.95, max_entries: int = 1024):
+        self.threshold = threshold
+        self.max_entries = max_entries
+        self.index = None
+        self.values: List[Any] = []
+        self._lock = threading.Lock()
+    
+    @staticmethod
+    def _as_query(embedding: Sequence[float]):
+        import faiss
+        import numpy as np
+        vector = np.array(embedding, dtype=np.float32).reshape(1, -1)
+        faiss.normalize_L2(vector)
+        return vector
+    
+    def get(self, embedding: Sequence[float]) -> Optional[Any]:
+        """Get the value stored for the most similar embedding, if similar enough."""
+        vector = self._as_query(embedding)
+        with self._lock:
+            if self.index is None or self.index.ntotal == 0:
+                return None
+            scores, ids = self.index.search(vector, 1)
+            if ids[0][0] < 0 or scores[0][0] < self.threshold:
+                return None
+            logger.debug("Semantic cache hit (similarity %.3f)", scores[0][0])
+            return self.values[ids[0][0]]
+    
+    def put(self, embedding: Sequence[float], value: Any) -> None:
+        """Store a value under the given embedding, evicting the oldest entry when full."""
+        import faiss
+        import numpy as np
+        vector = self._as_query(embedding)
+        with self._lock:
+            if self.index is None:
+                self.index = faiss.IndexFlatIP(vector.shape[1])
+            if self.index.ntotal >= self.max_entries:
+                # Flat indexes compact on removal, so ids stay aligned with `values`
+                self.index.remove_ids(np.array([0], dtype=np.int64))
+                self.values.pop(0)
+            self.index.add(vector)
+            self.values.append(value)
+    
+    def clear(self) -> None:
+        """Clear all cache entries."""
+        with self._lock:
+            if self.index is not None:
+                self.index.reset()
+            self.values.clear()
+    
+    def size(self) -> int:
+        """Get number of cache entries."""
+        return len(self.values)
+
 # Global cache instance
 cache = SimpleCache()
 
@@ -68,7 +143,7 @@ def cached(ttl: int = 3600, key_func: Optional[callable] = None):
             else:
                 # Default key generation
                 key_data = f"{func.__name__}:{str(args)}:{str(sorted(kwargs.items()))}"
-                cache_key = hashlib.md5(key_data.encode()).hexdigest()
+                cache_key = hashlib.blake2b(key_data.encode(), digest_size=16).digest()
             
             # Try to get from cache
             result = cache.get(cache_key)
@@ -83,12 +158,44 @@ def cached(ttl: int = 3600, key_func: Optional[callable] = None):
         return wrapper
     return decorator
 
-def cache_query_response(query: str, response: str, ttl: int = 1800) -> None:
-    """Cache a query response."""
-    cache_key = f"query:{hashlib.md5(query.encode()).hexdigest()}"
-    cache.set(cache_key, response, ttl)
+_response_cache = None
+
+def get_response_cache():
+    """Get the persistent, size-bounded response cache (opened on first use)."""
+    global _response_cache
+    if _response_cache is None:
+        import diskcache
+        from config.settings import get_settings
+        settings = get_settings()
+        _response_cache = diskcache.Cache(
+            settings.response_cache_dir,
+            size_limit=settings.response_cache_size_mb << 20
+        )
+    return _response_cache
+
+def response_cache_key(query: str, doc_ids: Iterable[str], chat_history: str = "") -> str:
+    """
+    Key a response by the normalized query, the ids of the retrieved chunks in
+    rank order, and the chat history it was generated with.
+
+    Case and whitespace differences in the query map to the same key, and the
+    key changes whenever the prompt would differ: other chunks, the same chunks
+    in another order (context is built and truncated in rank order), or another
+    conversation.
+    """
+    h = hashlib.blake2b(digest_size=16)
+    h.update(f"{normalize_query(query).lower}|{','.join(doc_ids)}|".encode())
+    h.update(chat_history.encode())
+    return h.hexdigest()
+
+def _query_key(query: str, context_key: bytes) -> bytes:
+    """Cache key for a query within a context; case and whitespace differences share a key."""
+    return b"query:" + context_key + normalize_query(query).key
+
+def cache_query_response(query: str, response: str, ttl: int = 1800, context_key: bytes = b"") -> None:
+    """Cache a query response. `context_key` scopes the entry, e.g. to a chat history digest."""
+    cache.set(_query_key(query, context_key), response, ttl)
 
-def get_cached_response(query: str) -> Optional[str]:
-    """Get cached response for a query."""
-    cache_key = f"query:{hashlib.md5(query.encode()).hexdigest()}"
-    return cache.get(cache_key)
+def get_cached_response(query: str, context_key: bytes = b"") -> Optional[str]:
+    """Get cached response for a query within the given context."""
+    return cache.get(_query_key(query, context_key))
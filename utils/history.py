@@ -0,0 +1,53 @@
+"""
+Bounded chat history for conversational prompts.
+"""
+import hashlib
+from collections import deque
+from typing import Deque, Optional
+
+class ChatHistory:
+    """
+    Keeps the last `max_turns` exchanges and their formatted transcript.
+
+    The transcript string is updated incrementally on each append instead of
+    being re-joined from the full history every turn. With `max_chars` set, the
+    oldest messages are also dropped while the transcript is longer than that;
+    the newest message is always kept.
+    """
+    
+    def __init__(self, max_turns: int = 6, max_chars: Optional[int] = None):
+        self.lines: Deque[str] = deque(maxlen=2 * max_turns)
+        self.max_chars = max_chars
+        self._text = ""
+        self._digest: Optional[bytes] = None
+    
+    def _drop_oldest(self) -> None:
+        # Drop the oldest line and its newline separator
+        self._text = self._text[len(self.lines.popleft()) + 1:]
+    
+    def append(self, speaker: str, message: str) -> None:
+        """Add a message, dropping the oldest ones once the buffer is full."""
+        line = f"{speaker}: {message}"
+        if len(self.lines) == self.lines.maxlen:
+            self._drop_oldest()
+        self.lines.append(line)
+        self._text = f"{self._text}\n{line}" if self._text else line
+        if self.max_chars is not None:
+            while len(self._text) > self.max_chars and len(self.lines) > 1:
+                self._drop_oldest()
+        self._digest = None
+    
+    @property
+    def text(self) -> str:
+        """The formatted transcript, one `speaker: message` line per message."""
+        return self._text
+    
+    @property
+    def digest(self) -> bytes:
+        """A short hash of the transcript, for use in cache keys."""
+        if self._digest is None:
+            self._digest = hashlib.blake2b(self._text.encode(), digest_size=16).digest()
+        return self._digest
+    
+    def __len__(self) -> int:
+        return len(self.lines)
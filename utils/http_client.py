@@ -0,0 +1,30 @@
+"""
+Shared HTTP client with a keep-alive connection pool for LLM requests.
+"""
+import asyncio
+import weakref
+
+import httpx
+
+from config.settings import get_settings
+
+# One client per event loop: httpx connection pools are bound to the loop they were created on
+_clients: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, httpx.AsyncClient]" = weakref.WeakKeyDictionary()
+
+def get_async_http_client() -> httpx.AsyncClient:
+    """
+    Get the pooled async HTTP client for the running event loop.
+
+    Connections are kept alive and reused across requests, so concurrent chats
+    do not each pay for a new TCP connection to the LLM server.
+    """
+    loop = asyncio.get_running_loop()
+    client = _clients.get(loop)
+    if client is None or client.is_closed:
+        settings = get_settings()
+        client = httpx.AsyncClient(
+            limits=httpx.Limits(max_keepalive_connections=1000, max_connections=1000),
+            timeout=settings.ollama_timeout
+        )
+        _clients[loop] = client
+    return client
@@ -11,7 +11,10 @@ from collections import defaultdict, deque
 
 logger = logging.getLogger(__name__)
 
-@dataclass
+# Minimum seconds between two refreshes of the system resource metrics
+SYSTEM_METRICS_INTERVAL = 2.0
+
+@dataclass(slots=True)
 class Metrics:
     """Application metrics container."""
     # Request metrics
@@ -35,6 +38,7 @@ class Metrics:
     
     # Response times (for calculating averages)
     response_times: deque = field(default_factory=lambda: deque(maxlen=100))
+    response_time_sum: float = 0.0
 
 class MetricsCollector:
     """Collects and manages application metrics."""
@@ -43,6 +47,10 @@ class MetricsCollector:
         self.metrics = Metrics()
         self.start_time = datetime.now()
         self.last_health_check = None
+        self._process = psutil.Process()
+        self._last_system_update = 0.0
+        # Prime the CPU counter so later non-blocking calls measure since this point
+        psutil.cpu_percent(interval=None)
     
     def record_request(self, success: bool, response_time: float, error_type: Optional[str] = None):
         """Record a request and its outcome."""
@@ -55,9 +63,13 @@ class MetricsCollector:
             if error_type:
                 self.metrics.error_counts[error_type] = self.metrics.error_counts.get(error_type, 0) + 1
         
-        # Update response time average
-        self.metrics.response_times.append(response_time)
-        self.metrics.average_response_time = sum(self.metrics.response_times) / len(self.metrics.response_times)
+        # Update response time average with a running sum over the window
+        response_times = self.metrics.response_times
+        if len(response_times) == response_times.maxlen:
+            self.metrics.response_time_sum -= response_times[0]
+        response_times.append(response_time)
+        self.metrics.response_time_sum += response_time
+        self.metrics.average_response_time = self.metrics.response_time_sum / len(response_times)
     
     def record_cache_event(self, hit: bool):
         """Record cache hit or miss."""
@@ -67,15 +79,18 @@ class MetricsCollector:
             self.metrics.cache_misses += 1
     
     def update_system_metrics(self):
-        """Update system resource metrics."""
+        """Update system resource metrics, at most once every SYSTEM_METRICS_INTERVAL seconds."""
+        now = time.monotonic()
+        if now - self._last_system_update < SYSTEM_METRICS_INTERVAL:
+            return
+        self._last_system_update = now
         try:
             # Memory usage
-            process = psutil.Process()
-            memory_info = process.memory_info()
+            memory_info = self._process.memory_info()
             self.metrics.memory_usage_mb = memory_info.rss / 1024 / 1024
             
-            # CPU usage
-            self.metrics.cpu_usage_percent = psutil.cpu_percent(interval=1)
+            # CPU usage since the previous call (non-blocking)
+            self.metrics.cpu_usage_percent = psutil.cpu_percent(interval=None)
             
             # Disk usage
             disk_usage = psutil.disk_usage('/')
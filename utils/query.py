@@ -0,0 +1,57 @@
+"""
+Query normalization shared by classification and caching.
+"""
+import hashlib
+import re
+from dataclasses import dataclass
+from functools import lru_cache
+from typing import NamedTuple
+
+# Keyword sets for classify_query_type, matched as whole words
+_GREET_RE = re.compile(r'\b(hello|hi|hey|good (morning|afternoon|evening)|how are you)\b')
+_THANKS_RE = re.compile(r'\b(thank|thanks|appreciate|grateful)\b')
+_QWORD_RE = re.compile(r'\b(what|how|why|when|where|who|can you|could you|tell me|explain)\b')
+
+class QueryInfo(NamedTuple):
+    """Classification of a user input, as returned by `classify_query_type`."""
+    is_greeting: bool
+    is_thanks: bool
+    has_question: bool
+    is_social: bool
+
+@dataclass(slots=True, frozen=True)
+class NormalizedQuery:
+    """A user query together with the forms derived from it."""
+    raw: str
+    lower: str  # Lowercased, with whitespace runs collapsed to single spaces
+    key: bytes  # BLAKE2b digest of `lower`, for cache keys
+    info: QueryInfo
+
+@lru_cache(maxsize=2048)
+def normalize_query(query: str) -> NormalizedQuery:
+    """
+    Lowercases, hashes and classifies a query in one place.
+
+    Memoized, so classification and every cache lookup for the same query
+    share a single normalization.
+    """
+    lower = " ".join(query.lower().split())
+    is_greeting = bool(_GREET_RE.search(lower))
+    is_thanks = bool(_THANKS_RE.search(lower))
+    has_question = '?' in lower or bool(_QWORD_RE.search(lower))
+    
+    return NormalizedQuery(
+        raw=query,
+        lower=lower,
+        key=hashlib.blake2b(lower.encode(), digest_size=16).digest(),
+        info=QueryInfo(
+            is_greeting=is_greeting,
+            is_thanks=is_thanks,
+            has_question=has_question,
+            is_social=is_greeting or is_thanks
+        )
+    )
+
+def classify_query_type(question: str) -> QueryInfo:
+    """Classify the type of user input for better response handling"""
+    return normalize_query(question).info
@@ -1,14 +1,35 @@
 """
 Retry utilities with exponential backoff for production reliability.
 """
+import asyncio
+import itertools
 import time
 import random
 from typing import Callable, Any, Optional, Type, Tuple
 from functools import wraps
 import logging
 
+import httpx
+import requests
+
 logger = logging.getLogger(__name__)
 
+# Transient failures talking to the Ollama server; anything else is a bug or a
+# permanent error and should fail immediately instead of backing off
+OLLAMA_TRANSIENT_ERRORS: Tuple[Type[Exception], ...] = (
+    ConnectionError,
+    TimeoutError,
+    httpx.TransportError,
+    requests.exceptions.ConnectionError,
+    requests.exceptions.Timeout,
+)
+
+# Backoff jitter multipliers in [0.5, 1.0), shuffled once so that consecutive
+# retries still spread out; cycling through them skips a PRNG call per backoff
+_JITTER = [0.5 + i / 512 * 0.5 for i in range(512)]
+random.shuffle(_JITTER)
+_jitter_cycle = itertools.cycle(_JITTER)
+
 class RetryError(Exception):
     """Exception raised when all retry attempts are exhausted."""
     pass
@@ -24,6 +45,9 @@ def retry_with_backoff(
     """
     Decorator for retrying functions with exponential backoff.
     
+    Coroutine functions are retried with `asyncio.sleep`, so a backoff does not
+    block the event loop.
+    
     Args:
         max_attempts: Maximum number of retry attempts
         base_delay: Base delay in seconds
@@ -32,37 +56,52 @@ def retry_with_backoff(
         jitter: Whether to add random jitter to prevent thundering herd
         exceptions: Tuple of exceptions to catch and retry on
     """
+    def compute_delay(attempt: int) -> float:
+        # Calculate delay with exponential backoff
+        delay = min(base_delay * (exponential_base ** attempt), max_delay)
+        
+        # Add jitter to prevent thundering herd
+        if jitter:
+            delay *= next(_jitter_cycle)
+        return delay
+    
+    def on_failure(func: Callable, attempt: int, e: Exception) -> float:
+        """Raises once attempts are exhausted, otherwise returns the delay before the next one."""
+        if attempt == max_attempts - 1:
+            logger.error("All %d attempts failed for %s", max_attempts, func.__name__)
+            raise RetryError(f"Function {func.__name__} failed after {max_attempts} attempts") from e
+        
+        delay = compute_delay(attempt)
+        logger.warning(
+            "Attempt %d/%d failed for %s: %s. Retrying in %.2f seconds...",
+            attempt + 1, max_attempts, func.__name__, e, delay
+        )
+        return delay
+    
     def decorator(func: Callable) -> Callable:
+        if asyncio.iscoroutinefunction(func):
+            @wraps(func)
+            async def async_wrapper(*args, **kwargs) -> Any:
+                for attempt in range(max_attempts):
+                    try:
+                        return await func(*args, **kwargs)
+                    except exceptions as e:
+                        # Sleep without blocking the event loop
+                        await asyncio.sleep(on_failure(func, attempt, e))
+                
+                raise RetryError(f"Function {func.__name__} failed after {max_attempts} attempts")
+            
+            return async_wrapper
+        
         @wraps(func)
         def wrapper(*args, **kwargs) -> Any:
-            last_exception = None
-            
             for attempt in range(max_attempts):
                 try:
                     return func(*args, **kwargs)
                 except exceptions as e:
-                    last_exception = e
-                    
-                    if attempt == max_attempts - 1:
-                        logger.error(f"All {max_attempts} attempts failed for {func.__name__}")
-                        raise RetryError(f"Function {func.__name__} failed after {max_attempts} attempts") from e
-                    
-                    # Calculate delay with exponential backoff
-                    delay = min(base_delay * (exponential_base ** attempt), max_delay)
-                    
-                    # Add jitter to prevent thundering herd
-                    if jitter:
-                        delay *= (0.5 + random.random() * 0.5)
-                    
-                    logger.warning(
-                        f"Attempt {attempt + 1}/{max_attempts} failed for {func.__name__}: {e}. "
-                        f"Retrying in {delay:.2f} seconds..."
-                    )
-                    
-                    time.sleep(delay)
+                    time.sleep(on_failure(func, attempt, e))
             
-            # This should never be reached, but just in case
-            raise RetryError(f"Function {func.__name__} failed after {max_attempts} attempts") from last_exception
+            raise RetryError(f"Function {func.__name__} failed after {max_attempts} attempts")
         
         return wrapper
     return decorator
@@ -77,7 +116,7 @@ def retry_ollama_connection(func: Callable) -> Callable:
         max_delay=30.0,
         exponential_base=2.0,
         jitter=True,
-        exceptions=(ConnectionError, TimeoutError, Exception)
+        exceptions=OLLAMA_TRANSIENT_ERRORS
     )(func)
 
 def retry_vector_store_operation(func: Callable) -> Callable:
@@ -90,5 +129,5 @@ def retry_vector_store_operation(func: Callable) -> Callable:
         max_delay=10.0,
         exponential_base=1.5,
         jitter=True,
-        exceptions=(OSError, IOError, Exception)
+        exceptions=(OSError,)
     )(func)
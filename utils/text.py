@@ -0,0 +1,30 @@
+"""
+Text helpers for fitting retrieved context into the prompt budget.
+"""
+import re
+from typing import Sequence, Tuple
+
+# Sentence-ending punctuation followed by whitespace or the end of the text
+_SENT_END_RE = re.compile(r'[.!?](?:\s|$)')
+
+def pick_cutoff(lengths: Sequence[int], max_chars: int) -> Tuple[int, int]:
+    """
+    Returns how many leading items fit whole within `max_chars`, and the
+    characters left over for a partial copy of the next one.
+    """
+    char_count = 0
+    for i, length in enumerate(lengths):
+        if char_count + length > max_chars:
+            return i, max_chars - char_count
+        char_count += length
+    return len(lengths), max_chars - char_count
+
+def cut_at_sentence(content: str, limit: int) -> str:
+    """Cuts content to `limit` characters, at the last sentence end in the final 30% if there is one."""
+    partial = content[:limit]
+    sentence_end = None
+    for sentence_end in _SENT_END_RE.finditer(partial, int(limit * 0.7)):
+        pass
+    if sentence_end is not None:
+        return partial[:sentence_end.start() + 1]
+    return partial + "..."
@@ -7,6 +7,24 @@ import logging
 
 logger = logging.getLogger(__name__)
 
+# Potentially malicious patterns, combined into one case-insensitive scan
+_DANGEROUS_RE = re.compile(
+    "|".join([
+        r'<script.*?>.*?</script>',  # Script tags
+        r'javascript:',              # JavaScript URLs
+        r'data:text/html',           # Data URLs
+        r'vbscript:',                # VBScript
+        r'on\w+\s*=',                # Event handlers
+    ]),
+    re.IGNORECASE | re.DOTALL
+)
+# Literal every dangerous pattern must contain ("=" for event handlers); ASCII
+# inputs without any of them skip the regex scan. Non-ASCII inputs always get the
+# scan: IGNORECASE matches characters such as "İ" or "ſ" against ASCII letters,
+# which no lowercasing of the input reproduces
+_DANGEROUS_LITERALS = ("<script", "javascript:", "data:text/html", "vbscript:", "=")
+_WHITESPACE_RE = re.compile(r'\s+')
+
 class ValidationError(Exception):
     """Custom exception for validation errors."""
     pass
@@ -27,35 +45,29 @@ def validate_query(query: str) -> str:
     if not query:
         raise ValidationError("Query cannot be empty")
     
-    # Remove leading/trailing whitespace
-    query = query.strip()
+    # Collapse whitespace runs and trim in one pass; the checks below all run
+    # on the text that is actually sent on
+    query = _WHITESPACE_RE.sub(' ', query).strip()
     
     if not query:
         raise ValidationError("Query cannot be empty or only whitespace")
     
     # Check length limits
-    if len(query) > 2000:
+    length = len(query)
+    if length > 2000:
         raise ValidationError("Query too long. Maximum 2000 characters allowed.")
     
-    if len(query) < 2:
+    if length < 2:
         raise ValidationError("Query too short. Minimum 2 characters required.")
     
     # Check for potentially malicious patterns
-    dangerous_patterns = [
-        r'<script.*?>.*?</script>',  # Script tags
-        r'javascript:',              # JavaScript URLs
-        r'data:text/html',           # Data URLs
-        r'vbscript:',                # VBScript
-        r'on\w+\s*=',                # Event handlers
-    ]
-    
-    for pattern in dangerous_patterns:
-        if re.search(pattern, query, re.IGNORECASE):
-            logger.warning(f"Potentially malicious input detected: {query[:50]}...")
-            raise ValidationError("Query contains potentially unsafe content")
-    
-    # Remove excessive whitespace
-    query = re.sub(r'\s+', ' ', query)
+    needs_scan = not query.isascii()
+    if not needs_scan:
+        query_lower = query.lower()
+        needs_scan = any(literal in query_lower for literal in _DANGEROUS_LITERALS)
+    if needs_scan and _DANGEROUS_RE.search(query):
+        logger.warning("Potentially malicious input detected: %s...", query[:50])
+        raise ValidationError("Query contains potentially unsafe content")
     
     return query
 
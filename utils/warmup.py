@@ -6,42 +6,90 @@ import logging
 from typing import Optional, Tuple
 from langchain_community.vectorstores import FAISS
 from langchain_community.llms import Ollama
+from config.settings import get_settings
 from utils.logging_config import get_logger
 
 logger = get_logger(__name__)
 
-def warmup_ollama_connection() -> Optional[Ollama]:
-    """Warm up Ollama connection and return the LLM instance."""
+async def warmup_ollama_connection() -> Optional[Ollama]:
+    """
+    Warm up Ollama connection and return the LLM instance.
+
+    The test call goes through the async client, so the pooled connection for
+    the running event loop is already open when the first user query arrives.
+    """
     try:
         from rag_pipeline import get_ollama_llm
-        llm = get_ollama_llm()
+        llm = await asyncio.to_thread(get_ollama_llm)
         if llm:
-            llm.invoke("test")
+            await llm.ainvoke("test")
             logger.info("Ollama connection warmed up successfully")
             return llm
     except Exception as e:
-        logger.warning(f"Failed to warm up Ollama connection: {e}")
+        logger.warning("Failed to warm up Ollama connection: %s", e)
     return None
 
-def warmup_vector_store() -> Optional[FAISS]:
+def warmup_embedding_model(vector_store: FAISS) -> None:
+    """
+    Compile the embedding model (if enabled) and run a dummy batch through it,
+    so the first user query does not pay for graph capture and weight page faults.
+    """
+    model = getattr(vector_store.embedding_function, "client", None)
+    if model is None:
+        return
+
+    module = model._first_module()
+    original = module.auto_model
+    compiled = False
+    if get_settings().embedding_compile and not hasattr(original, "_orig_mod"):
+        try:
+            import torch
+            # dynamic=True: query lengths vary, so avoid recompiling per sequence length
+            module.auto_model = torch.compile(original, mode="reduce-overhead", dynamic=True)
+            compiled = True
+        except Exception as e:
+            logger.warning("torch.compile unavailable for embedding model: %s", e)
+
+    try:
+        model.encode(["warmup"] * 8, batch_size=8)
+        logger.info("Embedding model warmed up%s", " (compiled)" if compiled else "")
+    except Exception as e:
+        if not compiled:
+            raise
+        logger.warning("Compiled embedding model failed, using eager mode: %s", e)
+        module.auto_model = original
+        model.encode(["warmup"] * 8, batch_size=8)
+
+def _load_and_warm_vector_store() -> Optional[FAISS]:
+    """Loads the vector store and runs a first embedding and search through it (blocking)."""
+    from vector_store_cache import get_vector_store
+    vector_store = get_vector_store()
+    if vector_store:
+        warmup_embedding_model(vector_store)
+        vector_store.similarity_search("test", k=1)
+    return vector_store
+
+async def warmup_vector_store() -> Optional[FAISS]:
     """Warm up vector store and return the instance."""
     try:
-        from vector_store import load_vector_store
-        vector_store = load_vector_store()
+        vector_store = await asyncio.to_thread(_load_and_warm_vector_store)
         if vector_store:
-            vector_store.similarity_search("test", k=1)
             logger.info("Vector store warmed up successfully")
             return vector_store
     except Exception as e:
-        logger.warning(f"Failed to warm up vector store: {e}")
+        logger.warning("Failed to warm up vector store: %s", e)
     return None
 
-def warmup_system() -> Tuple[Optional[FAISS], Optional[Ollama]]:
-    """Warm up the entire system and return the instances."""
+async def warmup_system() -> Tuple[Optional[FAISS], Optional[Ollama]]:
+    """
+    Warm up the entire system and return the instances.
+
+    The vector store and the Ollama connection are independent, so they warm up
+    concurrently and startup takes as long as the slower of the two.
+    """
     logger.info("Starting system warmup...")
     
-    vector_store = warmup_vector_store()
-    llm = warmup_ollama_connection()
+    vector_store, llm = await asyncio.gather(warmup_vector_store(), warmup_ollama_connection())
     
     if vector_store and llm:
         logger.info("System warmup completed successfully")
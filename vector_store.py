@@ -1,53 +1,309 @@
 import os
+import pickle
+import threading
+from functools import lru_cache
+from itertools import islice
+from pathlib import Path
+from typing import Iterable, Iterator, List, Optional
+
+import faiss
+import numpy as np
+from langchain_community.docstore.in_memory import InMemoryDocstore
 from langchain_community.embeddings import HuggingFaceEmbeddings
 from langchain_community.vectorstores import FAISS
+from langchain_community.vectorstores.utils import DistanceStrategy
+from langchain.schema.embeddings import Embeddings
+from langchain.docstore.document import Document
+from tqdm import tqdm
 
 from config.settings import get_settings
 import data_loader
+from onnx_embeddings import OnnxInt8Embeddings, QUANTIZED_MODEL_FILE, export_quantized_model
+
+_embedding_model_lock = threading.Lock()
+
+def get_embedding_model() -> Embeddings:
+    """
+    Returns the process-wide embedding model, loading it on first use.
+
+    Ingestion, index loading and warmup all share one instance instead of
+    each loading the model weights again.
+    """
+    with _embedding_model_lock:
+        return _load_embedding_model()
+
+@lru_cache(maxsize=1)
+def _load_embedding_model() -> Embeddings:
+    """
+    Initializes the embedding model.
 
-def get_embedding_model():
-    """Initializes and returns the sentence transformer embedding model."""
+    With `embedding_backend="onnx_int8"` the int8 ONNX model is used, and it is
+    exported on first use if it does not exist yet.
+    """
     settings = get_settings()
+    if settings.embedding_backend == "onnx_int8":
+        if not os.path.exists(os.path.join(settings.onnx_model_dir, QUANTIZED_MODEL_FILE)):
+            export_quantized_model(settings.embedding_model_name, settings.onnx_model_dir)
+        return OnnxInt8Embeddings(settings.onnx_model_dir, batch_size=settings.embedding_batch_size)
+
     return HuggingFaceEmbeddings(
         model_name=settings.embedding_model_name,
-        model_kwargs={'device': settings.embedding_device}
+        model_kwargs={'device': settings.embedding_device},
+        encode_kwargs={'normalize_embeddings': True}
     )
 
+def encode_texts(embeddings: Embeddings, texts: List[str]) -> np.ndarray:
+    """
+    Embeds all texts in large batches with the underlying model.
+
+    Args:
+        embeddings (Embeddings): The embedding model from `get_embedding_model`.
+        texts (List[str]): The chunk contents to embed.
+
+    Returns:
+        np.ndarray: A float32 matrix of L2-normalized embeddings, one row per text.
+    """
+    if isinstance(embeddings, OnnxInt8Embeddings):
+        vectors = embeddings.encode(texts)
+    else:
+        settings = get_settings()
+        vectors = embeddings.client.encode(
+            texts,
+            batch_size=settings.embedding_batch_size,
+            normalize_embeddings=True,
+            convert_to_numpy=True,
+            show_progress_bar=False
+        )
+    # Both backends already return unit-length rows, so inner product equals cosine similarity
+    return np.ascontiguousarray(vectors, dtype=np.float32)
+
+def open_embedding_cache():
+    """Opens the on-disk embedding cache for the configured model and backend."""
+    import diskcache
+
+    settings = get_settings()
+    cache_name = f"{settings.embedding_model_name.replace('/', '_')}-{settings.embedding_backend}"
+    return diskcache.Cache(os.path.join(settings.embedding_cache_dir, cache_name))
+
+def embed_chunks(embeddings: Embeddings, texts: List[str], ids: List[str], cache) -> np.ndarray:
+    """
+    Embeds chunks, reusing vectors stored in the on-disk embedding cache.
+
+    Only chunks whose id (content hash) is not yet cached are sent to the model.
+
+    Args:
+        embeddings (Embeddings): The embedding model from `get_embedding_model`.
+        texts (List[str]): The chunk contents.
+        ids (List[str]): The content hash of each chunk.
+        cache (diskcache.Cache): The cache from `open_embedding_cache`.
+
+    Returns:
+        np.ndarray: A float32 matrix of normalized embeddings, one row per text.
+    """
+    cached = [cache.get(chunk_id) for chunk_id in ids]
+    misses = [i for i, vector in enumerate(cached) if vector is None]
+
+    new_vectors = encode_texts(embeddings, [texts[i] for i in misses]) if misses else None
+    for row, i in enumerate(misses):
+        cached[i] = new_vectors[row].tobytes()
+        cache[ids[i]] = cached[i]
+
+    return np.vstack([np.frombuffer(vector, dtype=np.float32) for vector in cached])
+
+# Centroids per PQ sub-quantizer with 8-bit codes
+_PQ_CODEBOOK_SIZE = 256
+
+def build_faiss_index(vectors: np.ndarray) -> faiss.Index:
+    """
+    Creates an empty (but trained) index for the given L2-normalized vectors.
+
+    Inner product on normalized vectors is cosine similarity, which is what
+    the sentence-transformer models are trained for. The index type is picked
+    by `settings.faiss_index_type`:
+      - "flat":    Exact inner-product search (IndexFlatIP); best for small corpora.
+      - "flat_fp16": Exhaustive search over float16 vectors (half the memory of "flat").
+      - "hnsw":    HNSW graph over full float32 vectors.
+      - "hnsw_sq": HNSW graph over float16 vectors (half the memory traffic).
+      - "pq":      Exhaustive scan over product-quantized codes (`faiss_pq_m` bytes per vector).
+      - "ivfpq":   Inverted lists with product-quantized codes, for large corpora.
+                   Uses `settings.faiss_nlist` lists, fewer if the training
+                   sample has under 39 vectors per list.
+
+    Args:
+        vectors (np.ndarray): The embeddings; used for dimensionality and PQ / IVF-PQ training.
+            During streaming ingestion this is the held-back training sample, not the corpus.
+
+    Returns:
+        faiss.Index: The empty index, ready for `add`.
+    """
+    settings = get_settings()
+    dim = vectors.shape[1]
+    index_type = settings.faiss_index_type
+
+    if index_type == "ivfpq":
+        # The configured nlist, capped by the training points available
+        nlist = max(1, min(settings.faiss_nlist, len(vectors) // 39))
+        # Both the coarse centroids and the 256-entry PQ codebooks need ~39 training points each
+        min_train = 39 * max(nlist, _PQ_CODEBOOK_SIZE)
+        if len(vectors) < min_train or dim % settings.faiss_pq_m:
+            print(f"IVF-PQ needs at least {min_train} vectors and a dimension divisible by "
+                  f"{settings.faiss_pq_m}; falling back to 'hnsw_sq'.")
+            index_type = "hnsw_sq"
+        else:
+            quantizer = faiss.IndexFlatIP(dim)
+            index = faiss.IndexIVFPQ(
+                quantizer, dim, nlist, settings.faiss_pq_m, 8, faiss.METRIC_INNER_PRODUCT
+            )
+            index.train(vectors)
+            return index
+
+    if index_type == "pq":
+        min_train = 39 * _PQ_CODEBOOK_SIZE
+        if len(vectors) < min_train or dim % settings.faiss_pq_m:
+            print(f"PQ needs at least {min_train} vectors and a dimension divisible by "
+                  f"{settings.faiss_pq_m}; falling back to 'hnsw_sq'.")
+            index_type = "hnsw_sq"
+        else:
+            index = faiss.IndexPQ(dim, settings.faiss_pq_m, 8, faiss.METRIC_INNER_PRODUCT)
+            index.train(vectors)
+            return index
+
+    if index_type == "flat":
+        return faiss.IndexFlatIP(dim)
+
+    if index_type == "flat_fp16":
+        return faiss.IndexScalarQuantizer(dim, faiss.ScalarQuantizer.QT_fp16, faiss.METRIC_INNER_PRODUCT)
+
+    if index_type == "hnsw_sq":
+        index = faiss.IndexHNSWSQ(
+            dim, faiss.ScalarQuantizer.QT_fp16, settings.faiss_hnsw_m, faiss.METRIC_INNER_PRODUCT
+        )
+    else:
+        index = faiss.IndexHNSWFlat(dim, settings.faiss_hnsw_m, faiss.METRIC_INNER_PRODUCT)
+    index.hnsw.efConstruction = settings.faiss_ef_construction
+    return index
+
+def configure_index_for_search(index: faiss.Index) -> None:
+    """Applies query-time search parameters to a loaded index."""
+    settings = get_settings()
+    if hasattr(index, "hnsw"):
+        index.hnsw.efSearch = settings.faiss_ef_search
+    ivf = faiss.try_extract_index_ivf(index)
+    if ivf is not None:
+        ivf.nprobe = settings.faiss_nprobe
+
+def _batched(chunks: Iterable[Document], size: int) -> Iterator[List[Document]]:
+    """Groups an iterable of chunks into lists of at most `size`."""
+    iterator = iter(chunks)
+    while batch := list(islice(iterator, size)):
+        yield batch
+
+def _build_vector_store(embeddings: Embeddings, chunks: Iterable[Document]) -> Optional[FAISS]:
+    """
+    Embeds chunks batch by batch and adds each batch to the index as it is ready,
+    so only one batch of pages and vectors is alive at a time.
+
+    PQ and IVF-PQ indexes must be trained before anything is added, so for those
+    the first batches are held back until there are enough vectors to train on.
+    """
+    settings = get_settings()
+    if not isinstance(embeddings, OnnxInt8Embeddings):
+        # Let the PyTorch encoder use every core for this ingestion run
+        import torch
+        torch.set_num_threads(os.cpu_count())
+
+    min_train = {
+        "ivfpq": 39 * max(settings.faiss_nlist, _PQ_CODEBOOK_SIZE),
+        "pq": 39 * _PQ_CODEBOOK_SIZE,
+    }.get(settings.faiss_index_type, 0)
+    vector_store = None
+    pending = []
+
+    def add(store: FAISS, batch: List[Document], vectors: np.ndarray) -> None:
+        store.add_embeddings(
+            list(zip((chunk.page_content for chunk in batch), vectors)),
+            metadatas=[chunk.metadata for chunk in batch],
+            ids=[chunk.metadata["id"] for chunk in batch]
+        )
+
+    def flush_pending() -> FAISS:
+        store = FAISS(
+            embedding_function=embeddings,
+            index=build_faiss_index(np.vstack([vectors for _, vectors in pending])),
+            docstore=InMemoryDocstore(),
+            index_to_docstore_id={},
+            distance_strategy=DistanceStrategy.MAX_INNER_PRODUCT
+        )
+        for held_batch, held_vectors in pending:
+            add(store, held_batch, held_vectors)
+        pending.clear()
+        return store
+
+    with open_embedding_cache() as cache:
+        for batch in tqdm(_batched(chunks, settings.embedding_batch_size), desc="Embedding Chunks", unit="batch"):
+            vectors = embed_chunks(
+                embeddings, [chunk.page_content for chunk in batch], [chunk.metadata["id"] for chunk in batch], cache
+            )
+            if vector_store is not None:
+                add(vector_store, batch, vectors)
+                continue
+
+            pending.append((batch, vectors))
+            if sum(len(v) for _, v in pending) >= min_train:
+                vector_store = flush_pending()
+
+    if vector_store is None and pending:
+        # Not enough vectors to train PQ; build_faiss_index falls back to HNSW
+        vector_store = flush_pending()
+    return vector_store
+
 def create_and_save_vector_store():
     """
     The main ingestion pipeline.
-    1. Loads documents from the knowledge base.
-    2. Splits them into chunks.
-    3. Generates embeddings for each chunk.
-    4. Creates a FAISS vector store.
-    5. Saves the vector store locally.
+    1. Streams chunks from the knowledge base, one file at a time.
+    2. Generates embeddings for the chunks in batches.
+    3. Adds each batch to the FAISS vector store.
+    4. Saves the vector store locally.
     """
     print("--- Starting Ingestion Process ---")
     
-    documents = data_loader.load_documents()
-    if not documents:
-        print("No documents found. Aborting ingestion.")
-        return
-        
-    texts = data_loader.split_documents(documents)
-    
     settings = get_settings()
     print(f"Initializing embedding model: {settings.embedding_model_name}")
     embeddings = get_embedding_model()
     
     print("Creating FAISS vector store... (This may take a while for large document sets)")
     try:
-        vector_store = FAISS.from_documents(texts, embeddings)
+        vector_store = _build_vector_store(embeddings, data_loader.stream_chunks())
+        if vector_store is None:
+            print("No documents found. Aborting ingestion.")
+            return
+        print(f"Indexed {vector_store.index.ntotal} unique chunks.")
         
-        settings = get_settings()
         print(f"Saving FAISS index to: {settings.faiss_index_path}")
-        os.makedirs(settings.faiss_index_path, exist_ok=True)
+        Path(settings.faiss_index_path).mkdir(parents=True, exist_ok=True)
         vector_store.save_local(settings.faiss_index_path)
         
         print("--- Ingestion Complete ---")
     except Exception as e:
         print(f"An error occurred during vector store creation: {e}")
 
+def _read_index(index_file: str) -> faiss.Index:
+    """
+    Reads a FAISS index, memory-mapped when `settings.faiss_mmap` is enabled.
+
+    A memory-mapped index is not copied onto the heap: start-up does not scale
+    with index size, and the OS page cache shares the pages between every
+    process serving the index. Index types or FAISS builds that cannot be
+    mapped are read into memory instead.
+    """
+    settings = get_settings()
+    if settings.faiss_mmap:
+        try:
+            return faiss.read_index(index_file, faiss.IO_FLAG_MMAP | faiss.IO_FLAG_READ_ONLY)
+        except RuntimeError as e:
+            print(f"Memory-mapped loading not supported for this index ({e}); reading it into memory.")
+    return faiss.read_index(index_file)
+
 def load_vector_store():
     """
     Loads an existing FAISS vector store from the local file system.
@@ -56,21 +312,31 @@ def load_vector_store():
         FAISS: The loaded vector store object, or None if it fails.
     """
     settings = get_settings()
-    if not os.path.exists(settings.faiss_index_path):
-        print(f"Error: FAISS index not found at '{settings.faiss_index_path}'.")
-        print("Please run the ingestion process first with `python main.py ingest`")
-        return None
-
     print("Loading the vector store...")
     try:
+        # Read the docstore first: a missing index fails here, before the
+        # embedding model is loaded (faiss.read_index raises RuntimeError instead)
+        with open(os.path.join(settings.faiss_index_path, "index.pkl"), "rb") as f:
+            docstore, index_to_docstore_id = pickle.load(f)
         embeddings = get_embedding_model()
-        vector_store = FAISS.load_local(
-            settings.faiss_index_path, 
-            embeddings,
-            allow_dangerous_deserialization=True
+        index = _read_index(os.path.join(settings.faiss_index_path, "index.faiss"))
+        vector_store = FAISS(
+            embedding_function=embeddings,
+            index=index,
+            docstore=docstore,
+            index_to_docstore_id=index_to_docstore_id,
+            distance_strategy=DistanceStrategy.MAX_INNER_PRODUCT
         )
+        if index.metric_type != faiss.METRIC_INNER_PRODUCT:
+            print("Warning: this index was not built for inner-product search, so scores are not cosine "
+                  "similarities. Re-run `python main.py ingest` to rebuild it.")
+        configure_index_for_search(vector_store.index)
         print("Vector store loaded successfully.")
         return vector_store
+    except FileNotFoundError:
+        print(f"Error: FAISS index not found at '{settings.faiss_index_path}'.")
+        print("Please run the ingestion process first with `python main.py ingest`")
+        return None
     except Exception as e:
         print(f"Failed to load vector store: {e}")
-        return None
\ No newline at end of file
+        return None
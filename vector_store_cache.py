@@ -0,0 +1,50 @@
+"""
+Process-wide cache of the loaded vector store (and with it the embedding model).
+
+Loading the FAISS index and the sentence-transformer weights takes seconds, so
+every caller in a process (warmup, web startup, chat) shares one instance. The
+cache is keyed by the index path and its modification time, so a re-ingest is
+picked up on the next call.
+"""
+import os
+import threading
+from typing import Dict, Optional, Tuple
+
+from langchain_community.vectorstores import FAISS
+
+from config.settings import get_settings
+import vector_store as vs
+
+_SINGLETONS: Dict[Tuple[str, float], FAISS] = {}
+_lock = threading.Lock()
+
+def index_version() -> Optional[float]:
+    """Modification time of the saved FAISS index, or None if there is none yet."""
+    settings = get_settings()
+    try:
+        return os.path.getmtime(os.path.join(settings.faiss_index_path, "index.faiss"))
+    except OSError:
+        return None
+
+def get_vector_store() -> Optional[FAISS]:
+    """
+    Returns the shared vector store, loading it on first use or after a re-ingest.
+
+    Returns:
+        FAISS: The loaded vector store object, or None if it fails.
+    """
+    settings = get_settings()
+    mtime = index_version()
+    if mtime is None:
+        # Let the loader report the missing index
+        return vs.load_vector_store()
+
+    key = (settings.faiss_index_path, mtime)
+    with _lock:
+        if key not in _SINGLETONS:
+            vector_store = vs.load_vector_store()
+            if vector_store is None:
+                return None
+            _SINGLETONS.clear()
+            _SINGLETONS[key] = vector_store
+        return _SINGLETONS[key]
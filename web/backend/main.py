@@ -1,6 +1,10 @@
 
 import asyncio
+import hashlib
 import logging
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
 from typing import Optional
 from fastapi import FastAPI, WebSocket, WebSocketDisconnect, Depends, HTTPException
 from fastapi.staticfiles import StaticFiles
@@ -12,8 +16,15 @@ import sys
 sys.path.append(str(Path(__file__).parent.parent.parent))
 
 from rag_pipeline import create_rag_chain
-from vector_store import load_vector_store
+from utils.warmup import warmup_system
+from utils.query import normalize_query
+from vector_store_cache import index_version
+from config.settings import get_settings
 from utils.logging_config import setup_logging, get_logger
+from utils.cache import get_response_cache
+from utils.history import ChatHistory
+from utils.monitoring import get_metrics_collector
+from utils.performance import should_use_cache
 from langchain.schema.runnable import Runnable
 
 # Setup logging
@@ -22,19 +33,36 @@ logger = get_logger(__name__)
 
 app = FastAPI()
 
+settings = get_settings()
+metrics = get_metrics_collector()
+
+# Streamed tokens are sent once this many characters are pending, or once this
+# many seconds have passed since the last send, whichever comes first
+STREAM_FLUSH_CHARS = 64
+STREAM_FLUSH_INTERVAL = 0.032
+
+# Caps the number of RAG chain runs in flight across all WebSocket connections
+chain_semaphore = asyncio.Semaphore(settings.max_concurrent_requests)
+
 @app.on_event("startup")
 async def startup_event():
     """Load the RAG pipeline on startup."""
+    # Retrieval runs in the loop's default executor (asyncio.to_thread); one
+    # thread per core lets searches from concurrent chats overlap
+    asyncio.get_running_loop().set_default_executor(ThreadPoolExecutor(max_workers=os.cpu_count()))
+
     logger.info("Loading vector store and RAG chain...")
     try:
-        vector_store = load_vector_store()
+        vector_store, llm = await warmup_system()
         if vector_store:
-            app.state.rag_chain = create_rag_chain(vector_store)
+            app.state.rag_chain = create_rag_chain(vector_store, llm=llm)
+            # Cached answers are only valid for the index they were generated from
+            app.state.cache_namespace = f"web:{index_version()}|".encode()
             logger.info("RAG chain loaded successfully.")
         else:
             logger.error("Failed to load vector store. The chatbot will not be available.")
     except Exception as e:
-        logger.exception(f"Error during startup: {e}")
+        logger.exception("Error during startup: %s", e)
         logger.error("Chatbot initialization failed due to an unexpected error.")
 
 async def get_rag_chain() -> Runnable:
@@ -58,8 +86,9 @@ async def websocket_endpoint(websocket: WebSocket):
         logger.error("Closing WebSocket due to uninitialized RAG chain.")
         return
 
-    # In-memory chat history for the duration of the connection
-    chat_history = []
+    # In-memory chat history for the duration of the connection, capped in turns
+    # and characters so the prompt does not grow without bound
+    chat_history = ChatHistory(settings.max_history_turns, max_chars=settings.max_history_chars)
 
     await websocket.send_text("Ready to answer your questions!")
         
@@ -67,37 +96,64 @@ async def websocket_endpoint(websocket: WebSocket):
         while True:
             try:
                 data = await websocket.receive_text()
-                logger.info(f"Received query: {data}")
-
-                # Format chat history into a string
-                formatted_history = "\n".join([f"{speaker}: {message}" for speaker, message in chat_history])
-
-                # Stream the response
-                response_buffer = ""
-                logger.info("Starting RAG chain astream with history...")
-                async for chunk in rag_chain.astream({
-                    "question": data,
-                    "chat_history": formatted_history
-                }):
-                    response_buffer += chunk
-                    await websocket.send_text(chunk)
-                
-                logger.info(f"Finished RAG chain astream. Full response: {response_buffer}")
+                logger.info("Received query: %s", data)
+
+                # Repeats of a question (up to case and whitespace) in the same conversation
+                # state and against the same index skip the chain, retrieval included
+                use_cache = settings.enable_caching and should_use_cache(data)
+                cached_response = None
+                if use_cache:
+                    cache_key = hashlib.blake2b(
+                        app.state.cache_namespace + normalize_query(data).key + chat_history.digest, digest_size=16
+                    ).hexdigest()
+                    cached_response = get_response_cache().get(cache_key)
+                if cached_response is not None:
+                    # Only hits are recorded here; on a miss the chain's response cache
+                    # records the request's single cache event
+                    metrics.record_cache_event(hit=True)
+                    logger.info("Serving response from cache")
+                    response_buffer = cached_response
+                    await websocket.send_bytes(cached_response.encode())
+                else:
+                    # Stream the response, coalescing tokens into fewer WebSocket frames. Answer
+                    # text goes out as UTF-8 binary frames, which the browser does not re-validate
+                    response_buffer = ""
+                    pending = ""
+                    last_flush = time.monotonic()
+                    logger.info("Starting RAG chain astream with history...")
+                    async with chain_semaphore:
+                        async for chunk in rag_chain.astream({
+                            "question": data,
+                            "chat_history": chat_history.text
+                        }):
+                            response_buffer += chunk
+                            pending += chunk
+                            now = time.monotonic()
+                            if len(pending) >= STREAM_FLUSH_CHARS or now - last_flush >= STREAM_FLUSH_INTERVAL:
+                                await websocket.send_bytes(pending.encode())
+                                pending = ""
+                                last_flush = now
+                    if pending:
+                        await websocket.send_bytes(pending.encode())
+                    
+                    logger.info("Finished RAG chain astream. Full response: %s", response_buffer)
+                    if use_cache:
+                        get_response_cache().set(cache_key, response_buffer, expire=settings.cache_ttl)
 
                 # Update chat history
-                chat_history.append(("User", data))
-                chat_history.append(("BOT", response_buffer))
+                chat_history.append("User", data)
+                chat_history.append("BOT", response_buffer)
                 
             except WebSocketDisconnect:
                 logger.info("WebSocket disconnected gracefully.")
                 break
             except Exception as e:
-                logger.error(f"Error during chat loop: {e}", exc_info=True)
+                logger.error("Error during chat loop: %s", e, exc_info=True)
                 await websocket.send_text("An error occurred while processing your message. Please try again.")
                 continue
 
     except Exception as e:
-        logger.error(f"An unexpected error occurred in the WebSocket endpoint: {e}", exc_info=True)
+        logger.error("An unexpected error occurred in the WebSocket endpoint: %s", e, exc_info=True)
     finally:
         logger.info("Closing WebSocket connection.")
 
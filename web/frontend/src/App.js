@@ -49,6 +49,9 @@ function App() {
     }
 
     ws.current = new WebSocket(`ws://${window.location.host}/chat`);
+    // Answer text arrives as UTF-8 binary frames; status messages as text frames
+    ws.current.binaryType = 'arraybuffer';
+    const decoder = new TextDecoder();
 
     ws.current.onopen = () => {
       console.log('WebSocket connection established.');
@@ -65,6 +68,7 @@ function App() {
     };
 
     ws.current.onmessage = (event) => {
+      const data = typeof event.data === 'string' ? event.data : decoder.decode(event.data);
       if (isTypingRef.current) {
         setIsTyping(false);
       }
@@ -74,10 +78,10 @@ function App() {
         if (lastMessage && lastMessage.sender === 'bot') {
           return [
             ...prevMessages.slice(0, prevMessages.length - 1),
-            { ...lastMessage, text: lastMessage.text + event.data },
+            { ...lastMessage, text: lastMessage.text + data },
           ];
         } else {
-          return [...prevMessages, { sender: 'bot', text: event.data }];
+          return [...prevMessages, { sender: 'bot', text: data }];
         }
       });
     };